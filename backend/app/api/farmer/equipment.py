@@ -3,7 +3,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from app.services.farmer.equipment_service import (
@@ -443,7 +443,11 @@ def api_predict_weekly_equipment_demand(unit_plans: List[UnitPlanWeekly], horizo
     plans = [p.dict() for p in unit_plans]
 
     demand = predict_equipment_demand(plans, horizon_days=horizon_days)
-    weekly = aggregate_weekly_equipment_demand(demand.get("date_equipment_map", {}))
+    horizon_start = demand.get("horizon_start")
+    weekly = aggregate_weekly_equipment_demand(
+        demand.get("date_equipment_map", {}),
+        horizon_start=date.fromisoformat(horizon_start) if horizon_start else None
+    )
 
     return {
         "horizon_start": demand.get("horizon_start"),
@@ -1,5 +1,6 @@
 # backend/app/services/farmer/emissions_service.py
 
+import heapq
 from datetime import datetime, timedelta
 from threading import Lock
 from typing import Dict, Any, List, Optional
@@ -20,6 +21,11 @@ _DEFAULT_EMISSION_FACTORS = {
     # if you store liters of other fuels, add mapping here (e.g., "bio_diesel_l_per_l": 2.0)
 }
 
+# direct fuel → factor lookup derived from the defaults above ("diesel" → 2.68)
+_FACTOR_SUFFIX = "_l_per_l"
+_FACTOR_BY_FUEL = {k.removesuffix(_FACTOR_SUFFIX): v for k, v in _DEFAULT_EMISSION_FACTORS.items()}
+_DIESEL_FACTOR = _FACTOR_BY_FUEL["diesel"]
+
 # small in-memory cache lock
 _emissions_cache_lock = Lock()
 _emissions_cache: Dict[str, Any] = {}
@@ -41,23 +47,37 @@ def estimate_emissions_from_fuel(
     Estimate kg CO2 from liters using emission factors.
     Returns: kg CO2
     """
-    ef = emission_factors or _DEFAULT_EMISSION_FACTORS
-    key = f"{fuel_type}_l_per_l" if not fuel_type.endswith("_l_per_l") else fuel_type
-    factor = ef.get(key)
+    return liters * _factor_for(_resolve_emission_factors(emission_factors), fuel_type)
+
+
+def _resolve_emission_factors(emission_factors: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """
+    Normalizes override factors ({"diesel_l_per_l": 2.68} style) into a fuel → factor map.
+    Loops resolve once up front and then use _factor_for per record.
+    """
+    if not emission_factors:
+        return _FACTOR_BY_FUEL
+    return {k.removesuffix(_FACTOR_SUFFIX): float(v) for k, v in emission_factors.items()}
+
+
+def _factor_for(factors: Dict[str, float], fuel_type: str) -> float:
+    factor = factors.get(fuel_type.removesuffix(_FACTOR_SUFFIX))
     if factor is None:
         # default to diesel factor if unknown
-        factor = ef.get("diesel_l_per_l", 2.68)
-    return liters * float(factor)
+        factor = factors.get("diesel", _DIESEL_FACTOR)
+    return factor
 
 
 def equipment_emissions_from_logs(
     equipment_id: str,
     lookback_days: int = 90,
-    emission_factors: Optional[Dict[str, float]] = None
+    emission_factors: Optional[Dict[str, float]] = None,
+    now_iso: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Aggregate emissions for a single equipment from fuel logs.
     Returns breakdown (kg CO2) by fuel type and total (kg + tonnes).
+    now_iso lets fleet callers stamp every result with one shared timestamp.
     """
     logs = _gather_fuel_logs_for_equipment(equipment_id, lookback_days=lookback_days)
     if not logs:
@@ -68,22 +88,26 @@ def equipment_emissions_from_logs(
             "total_kg_co2": 0.0,
             "total_tonnes_co2": 0.0,
             "by_fuel_type": {},
-            "generated_at": datetime.utcnow().isoformat()
+            "generated_at": now_iso or datetime.utcnow().isoformat()
         }
 
     by_type: Dict[str, float] = {}
     total_kg = 0.0
+    # local aliases keep attribute/global lookups out of the per-log loop
+    factors = _resolve_emission_factors(emission_factors)
+    factor_for = _factor_for
+    by_type_get = by_type.get
 
     for e in logs:
+        get = e.get
         # assume e.liters is signed (consumption negative), but use absolute liters refuel/consumed
-        liters = abs(float(e.get("liters", 0)))
+        liters = abs(float(get("liters", 0)))
         # prefer fuel_type field if provided in log; else default to 'diesel'
-        fuel_type = e.get("fuel_type") or e.get("fuel") or "diesel"
         # normalize short forms (allow 'petrol' and 'diesel')
-        fuel_type = str(fuel_type).lower()
+        fuel_type = str(get("fuel_type") or get("fuel") or "diesel").lower()
 
-        kg = estimate_emissions_from_fuel(liters, fuel_type=fuel_type, emission_factors=emission_factors)
-        by_type[fuel_type] = by_type.get(fuel_type, 0.0) + kg
+        kg = liters * factor_for(factors, fuel_type)
+        by_type[fuel_type] = by_type_get(fuel_type, 0.0) + kg
         total_kg += kg
 
     return {
@@ -93,14 +117,15 @@ def equipment_emissions_from_logs(
         "total_tonnes_co2": round(total_kg / 1000.0, 3),
         "by_fuel_type": {k: round(v, 2) for k, v in by_type.items()},
         "samples": len(logs),
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": now_iso or datetime.utcnow().isoformat()
     }
 
 
 def equipment_emissions_estimate_from_hours(
     equipment_id: str,
     lookback_days: int = 90,
-    emission_factors: Optional[Dict[str, float]] = None
+    emission_factors: Optional[Dict[str, float]] = None,
+    now_iso: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     When fuel logs are missing, estimate emissions using operating cost and assumed liters-per-cost
@@ -135,10 +160,26 @@ def equipment_emissions_estimate_from_hours(
         "estimated_liters": round(estimated_liters, 2),
         "estimated_kg_co2": round(kg, 2),
         "estimated_tonnes_co2": round(kg / 1000.0, 3),
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": now_iso or datetime.utcnow().isoformat()
     }
 
 
+def _estimate_lph_from_cost(equipment_id: str) -> float:
+    """
+    Crude liters-per-hour estimate from equipment operating cost.
+    Falls back to 3 L/hr when there is no usable cost data.
+    """
+    cost = compute_equipment_operating_cost(equipment_id) or {}
+    fuel_cost = cost.get("fuel_cost", 0.0)
+    total_hours = cost.get("total_hours", 0) or 0
+    if total_hours and fuel_cost and fuel_cost > 0:
+        # crude: fuel liters = fuel_cost / assumed_price -> derive lph = liters / total_hours
+        assumed_price = 100.0
+        liters_total = fuel_cost / assumed_price
+        return liters_total / max(1.0, total_hours)
+    return 3.0
+
+
 def equipment_task_level_emissions(
     equipment_id: str,
     task_events: List[Dict[str, Any]],
@@ -151,32 +192,29 @@ def equipment_task_level_emissions(
     """
     per_task = []
     total_kg = 0.0
+    default_lph = None  # derived lazily, depends only on equipment_id
+    factors = _resolve_emission_factors(emission_factors)
+    factor_for = _factor_for
+    append = per_task.append
 
     for t in task_events:
-        liters = t.get("liters_used")
-        fuel_type = (t.get("fuel_type") or "diesel").lower()
+        get = t.get
+        liters = get("liters_used")
+        fuel_type = (get("fuel_type") or "diesel").lower()
         if liters is None:
             # derive liters from estimated_hours and default liters_per_hour or equipment cost
-            est_hours = float(t.get("estimated_hours", 0) or 0)
+            est_hours = float(get("estimated_hours", 0) or 0)
             if est_hours and est_hours > 0:
-                # try to estimate lph from equipment operating cost
-                cost = compute_equipment_operating_cost(equipment_id) or {}
-                fuel_cost = cost.get("fuel_cost", 0.0)
-                total_hours = cost.get("total_hours", 0) or 0
-                lph = 3.0
-                if total_hours and fuel_cost and fuel_cost > 0:
-                    # crude: fuel liters = fuel_cost / assumed_price -> derive lph = liters / total_hours
-                    assumed_price = 100.0
-                    liters_total = fuel_cost / assumed_price
-                    lph = liters_total / max(1.0, total_hours)
-                liters = est_hours * lph
+                if default_lph is None:
+                    default_lph = _estimate_lph_from_cost(equipment_id)
+                liters = est_hours * default_lph
             else:
                 liters = 0.0
 
-        kg = estimate_emissions_from_fuel(abs(float(liters)), fuel_type=fuel_type, emission_factors=emission_factors)
+        kg = abs(float(liters)) * factor_for(factors, fuel_type)
         total_kg += kg
-        per_task.append({
-            "task_id": t.get("task_id"),
+        append({
+            "task_id": get("task_id"),
             "liters_used": round(float(liters), 2),
             "kg_co2": round(kg, 2),
             "tonnes_co2": round(kg / 1000.0, 3)
@@ -201,24 +239,26 @@ def fleet_emissions_summary(
     """
     results = []
     total_kg = 0.0
+    now_iso = datetime.utcnow().isoformat()
 
     with _store_lock:
         ids = list(_equipment_store.keys())
 
     for eid in ids:
-        ann = equipment_emissions_from_logs(eid, lookback_days=lookback_days, emission_factors=emission_factors)
+        ann = equipment_emissions_from_logs(eid, lookback_days=lookback_days, emission_factors=emission_factors, now_iso=now_iso)
         if ann.get("status") == "no_fuel_logs":
-            ann = equipment_emissions_estimate_from_hours(eid, lookback_days=lookback_days, emission_factors=emission_factors)
+            ann = equipment_emissions_estimate_from_hours(eid, lookback_days=lookback_days, emission_factors=emission_factors, now_iso=now_iso)
         kg = ann.get("total_kg_co2") or ann.get("estimated_kg_co2") or 0.0
         results.append({"equipment_id": eid, "kg_co2": kg, "details": ann})
         total_kg += kg
 
-    results.sort(key=lambda x: x["kg_co2"], reverse=True)
+    # only the top 50 are returned: a bounded heap avoids sorting the whole fleet
+    top_emitters = heapq.nlargest(50, results, key=lambda x: x["kg_co2"])
 
     return {
         "lookback_days": lookback_days,
         "fleet_total_kg_co2": round(total_kg, 2),
         "fleet_total_tonnes_co2": round(total_kg / 1000.0, 3),
-        "top_emitters": results[:50],
-        "generated_at": datetime.utcnow().isoformat()
+        "top_emitters": top_emitters,
+        "generated_at": now_iso
     }
@@ -1,16 +1,42 @@
 # backend/app/services/farmer/equipment_documents_service.py
 
-from datetime import datetime, timedelta
+import bisect
+import itertools
+from datetime import datetime
+from functools import lru_cache
 from threading import Lock
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 # ===========================
 #  DOCUMENT STORAGE
 # ===========================
 
+# Read-copy-update: writers build a new dict (and a new per-equipment list)
+# under _docs_lock and rebind _docs_store; readers just grab the current
+# reference without locking. Published dicts/lists are never mutated.
 _docs_store: Dict[str, List[Dict[str, Any]]] = {}
 _docs_lock = Lock()
 
+# Secondary index of documents with a parseable expiry, sorted by
+# (expiry ordinal, insert seq). Published the same RCU way as _docs_store,
+# so get_expiring_documents() is a bisect range scan instead of a full sweep.
+_docs_by_expiry: List[Tuple[int, int, str, Dict[str, Any]]] = []
+_expiry_seq = itertools.count()
+
+
+@lru_cache(maxsize=4096)
+def _expiry_ordinal(expiry: str) -> Optional[int]:
+    """
+    Parses an ISO expiry date into a proleptic ordinal (date.toordinal()).
+    Cached per distinct string so repeated sweeps compare plain ints;
+    add_equipment_document() primes it so queries rarely parse at all.
+    Returns None when the value cannot be parsed.
+    """
+    try:
+        return datetime.fromisoformat(expiry).date().toordinal()
+    except (ValueError, TypeError):
+        return None
+
 
 def add_equipment_document(
     equipment_id: str,
@@ -37,18 +63,33 @@ def add_equipment_document(
         "uploaded_at": datetime.utcnow().isoformat()
     }
 
+    if expiry_date:
+        _expiry_ordinal(expiry_date)
+
+    global _docs_store
     with _docs_lock:
-        if equipment_id not in _docs_store:
-            _docs_store[equipment_id] = []
-        _docs_store[equipment_id].append(record)
+        docs = _docs_store.get(equipment_id, [])
+        _docs_store = {**_docs_store, equipment_id: [*docs, record]}
+        _index_document_expiry(equipment_id, record)
 
     return record
 
 
+def _index_document_expiry(equipment_id: str, record: Dict[str, Any]) -> None:
+    """Adds record to _docs_by_expiry. Caller must hold _docs_lock."""
+    global _docs_by_expiry
+    expiry = record.get("expiry_date")
+    ed_ord = _expiry_ordinal(expiry) if expiry else None
+    if ed_ord is None:
+        return
+    index = list(_docs_by_expiry)
+    bisect.insort(index, (ed_ord, next(_expiry_seq), equipment_id, record))
+    _docs_by_expiry = index
+
+
 def list_equipment_documents(equipment_id: str) -> Dict[str, Any]:
     """Returns all documents belonging to an equipment."""
-    with _docs_lock:
-        docs = _docs_store.get(equipment_id, [])
+    docs = _docs_store.get(equipment_id, [])
 
     return {
         "equipment_id": equipment_id,
@@ -62,40 +103,34 @@ def get_expiring_documents(within_days: int = 30) -> Dict[str, Any]:
     Returns documents expiring within next X days.
     """
 
-    now = datetime.utcnow().date()
-    cutoff = now + timedelta(days=within_days)
-
-    results = []
-
-    with _docs_lock:
-        for eq_id, docs in _docs_store.items():
-            for d in docs:
-                expiry = d.get("expiry_date")
-                if not expiry:
-                    continue
-
-                try:
-                    ed = datetime.fromisoformat(expiry).date()
-                except:
-                    continue
-
-                if now <= ed <= cutoff:
-                    results.append({
-                        "equipment_id": eq_id,
-                        "doc_type": d.get("doc_type"),
-                        "doc_number": d.get("doc_number"),
-                        "expiry_date": expiry,
-                        "days_left": (ed - now).days,
-                        "file_url": d.get("file_url"),
-                    })
-
-    results.sort(key=lambda x: x["days_left"])
+    now_dt = datetime.utcnow()
+    now_ord = now_dt.date().toordinal()
+    now_iso = now_dt.isoformat()
+    cutoff_ord = now_ord + within_days
+
+    # lock-free read of the current published index; entries are already in
+    # expiry order, so only the [now, cutoff] slice is visited
+    index = _docs_by_expiry
+    lo = bisect.bisect_left(index, (now_ord,))
+    hi = bisect.bisect_left(index, (cutoff_ord + 1,))
+
+    results = [
+        {
+            "equipment_id": eq_id,
+            "doc_type": d.get("doc_type"),
+            "doc_number": d.get("doc_number"),
+            "expiry_date": d.get("expiry_date"),
+            "days_left": ed_ord - now_ord,
+            "file_url": d.get("file_url"),
+        }
+        for ed_ord, _, eq_id, d in index[lo:hi]
+    ]
 
     return {
         "within_days": within_days,
         "count": len(results),
         "expiring_documents": results,
-        "checked_at": datetime.utcnow().isoformat()
+        "checked_at": now_iso
     }
 
 
@@ -111,8 +146,32 @@ _COMPLIANCE_DOC_TYPES = {
     "emission": ["puc", "pollution", "emission_certificate"]
 }
 
+# reverse lookup: document type → compliance category
+_DOC_TYPE_TO_CATEGORY = {
+    alias: comp_type
+    for comp_type, aliases in _COMPLIANCE_DOC_TYPES.items()
+    for alias in aliases
+}
+
+# compliance score → risk level (score < 40 critical, < 60 high, < 80 medium, else low)
+_RISK_THRESHOLDS = (40, 60, 80)
+_RISK_LABELS = ("critical", "high", "medium", "low")
+
+# days left → document status (< 0 expired, 0–7 due soon, >= 8 valid)
+_DAYS_LEFT_THRESHOLDS = (0, 8)
+_DAYS_LEFT_STATUSES = ("expired", "due_soon", "valid")
+
+# status → (score deduction, alert template or None)
+_STATUS_RULES = {
+    "missing": (25, "{comp} document missing"),
+    "invalid_date": (20, "{comp} document has invalid expiry date"),
+    "expired": (40, "{comp} is EXPIRED ({days_ago} days ago)"),
+    "due_soon": (20, "{comp} expires soon (in {days} days)"),
+    "valid": (0, None),
+}
+
 
-def compute_equipment_compliance(equipment_id: str) -> Optional[Dict[str, Any]]:
+def compute_equipment_compliance(equipment_id: str, now_iso: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Computes compliance score and alerts for:
     - Insurance
@@ -122,6 +181,8 @@ def compute_equipment_compliance(equipment_id: str) -> Optional[Dict[str, Any]]:
 
     Score = 0–100
     Risk Levels = low / medium / high / critical
+
+    now_iso lets fleet callers share one evaluation timestamp.
     """
 
     docs_info = list_equipment_documents(equipment_id)
@@ -129,82 +190,52 @@ def compute_equipment_compliance(equipment_id: str) -> Optional[Dict[str, Any]]:
         return None
 
     docs = docs_info.get("documents", [])
-    now = datetime.utcnow().date()
+    now_ord = datetime.utcnow().date().toordinal()
     alerts = []
     score = 100  # deduct for each problem
 
-    # group documents by compliance category
-    grouped_docs = {k: [] for k in _COMPLIANCE_DOC_TYPES.keys()}
+    # keep only the latest uploaded document per compliance category
+    latest_per_cat: Dict[str, Optional[Dict[str, Any]]] = {k: None for k in _COMPLIANCE_DOC_TYPES}
 
     for d in docs:
-        dt = d.get("doc_type", "").lower()
-        for comp_type, aliases in _COMPLIANCE_DOC_TYPES.items():
-            if dt in aliases:
-                grouped_docs[comp_type].append(d)
-
-    def parse_expiry(doc):
-        expiry = doc.get("expiry_date")
-        if not expiry:
-            return None, None
-        try:
-            ed = datetime.fromisoformat(expiry).date()
-            return ed, (ed - now).days
-        except:
-            return None, None
-
-    breakdown = {}
-
-    # evaluate each compliance category
-    for comp_type, doc_list in grouped_docs.items():
-
-        # no documents → missing
-        if not doc_list:
-            alerts.append(f"{comp_type} document missing")
-            score -= 25
-            breakdown[comp_type] = {"status": "missing"}
+        cat = _DOC_TYPE_TO_CATEGORY.get(d.get("doc_type", "").lower())
+        if cat is None:
             continue
+        current = latest_per_cat[cat]
+        if current is None or (d.get("uploaded_at") or "") >= (current.get("uploaded_at") or ""):
+            latest_per_cat[cat] = d
 
-        # use the latest uploaded document
-        doc = doc_list[-1]
-        exp_date, days_left = parse_expiry(doc)
+    breakdown = {}
 
-        if exp_date is None:
-            alerts.append(f"{comp_type} document has invalid expiry date")
-            score -= 20
-            breakdown[comp_type] = {"status": "invalid_date"}
-            continue
+    # evaluate each compliance category: derive a status, then apply its rule
+    for comp_type, doc in latest_per_cat.items():
+        days_left = None
 
-        if days_left < 0:
-            alerts.append(f"{comp_type} is EXPIRED ({abs(days_left)} days ago)")
-            score -= 40
-            breakdown[comp_type] = {
-                "status": "expired",
-                "days_left": days_left
-            }
-        elif days_left <= 7:
-            alerts.append(f"{comp_type} expires soon (in {days_left} days)")
-            score -= 20
-            breakdown[comp_type] = {
-                "status": "due_soon",
-                "days_left": days_left
-            }
+        if doc is None:
+            status = "missing"
         else:
-            breakdown[comp_type] = {
-                "status": "valid",
-                "days_left": days_left
-            }
+            expiry = doc.get("expiry_date")
+            ed_ord = _expiry_ordinal(expiry) if expiry else None
+            if ed_ord is None:
+                status = "invalid_date"
+            else:
+                days_left = ed_ord - now_ord
+                status = _DAYS_LEFT_STATUSES[bisect.bisect_right(_DAYS_LEFT_THRESHOLDS, days_left)]
+
+        deduction, alert = _STATUS_RULES[status]
+        score -= deduction
+        if alert:
+            alerts.append(alert.format(comp=comp_type, days=days_left, days_ago=abs(days_left or 0)))
+
+        if days_left is None:
+            breakdown[comp_type] = {"status": status}
+        else:
+            breakdown[comp_type] = {"status": status, "days_left": days_left}
 
     # clamp score
     score = max(0, min(100, score))
 
-    if score >= 80:
-        risk = "low"
-    elif score >= 60:
-        risk = "medium"
-    elif score >= 40:
-        risk = "high"
-    else:
-        risk = "critical"
+    risk = _RISK_LABELS[bisect.bisect_right(_RISK_THRESHOLDS, score)]
 
     return {
         "equipment_id": equipment_id,
@@ -212,7 +243,7 @@ def compute_equipment_compliance(equipment_id: str) -> Optional[Dict[str, Any]]:
         "risk_level": risk,
         "alerts": alerts,
         "breakdown": breakdown,
-        "evaluated_at": datetime.utcnow().isoformat()
+        "evaluated_at": now_iso or datetime.utcnow().isoformat()
     }
 
 
@@ -222,13 +253,13 @@ def fleet_compliance_overview() -> Dict[str, Any]:
     """
 
     results = []
+    now_iso = datetime.utcnow().isoformat()
 
     # We check documents for any equipment_id in docs store
-    with _docs_lock:
-        eq_ids = list(_docs_store.keys())
+    eq_ids = list(_docs_store)
 
     for eid in eq_ids:
-        comp = compute_equipment_compliance(eid)
+        comp = compute_equipment_compliance(eid, now_iso=now_iso)
         if comp:
             results.append(comp)
 
@@ -238,7 +269,7 @@ def fleet_compliance_overview() -> Dict[str, Any]:
     return {
         "count": len(results),
         "fleet_compliance": results,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": now_iso
     }
 
 from datetime import datetime
@@ -258,16 +289,17 @@ from app.services.farmer.equipment_service import (
 # Equipment Document Store (in-memory)
 # -----------------------------------------------------------
 
+# same read-copy-update scheme as _docs_store above
 _equipment_documents_store: Dict[str, List[Dict[str, Any]]] = {}
 _documents_lock = Lock()
 
-# Required documents per equipment type
+# Required documents per equipment type (tuples: immutable, ordered for stable output)
 REQUIRED_DOCS_BY_TYPE = {
-    "tractor": ["rc_book", "insurance", "pollution", "fitness"],
-    "harvester": ["rc_book", "insurance", "fitness"],
-    "sprayer": ["purchase_invoice"],
-    "rotavator": ["purchase_invoice"],
-    "power_tiller": ["rc_book", "insurance"],
+    "tractor": ("rc_book", "insurance", "pollution", "fitness"),
+    "harvester": ("rc_book", "insurance", "fitness"),
+    "sprayer": ("purchase_invoice",),
+    "rotavator": ("purchase_invoice",),
+    "power_tiller": ("rc_book", "insurance"),
 }
 
 
@@ -298,12 +330,16 @@ def add_equipment_document(
         "uploaded_at": datetime.utcnow().isoformat(),
     }
 
+    if expiry_date:
+        _expiry_ordinal(expiry_date)
+
+    global _equipment_documents_store
     with _documents_lock:
         existing = _equipment_documents_store.get(equipment_id, [])
         # Replace existing same-type document
         existing = [d for d in existing if d["document_type"] != document_type.lower()]
         existing.append(doc)
-        _equipment_documents_store[equipment_id] = existing
+        _equipment_documents_store = {**_equipment_documents_store, equipment_id: existing}
 
     return doc
 
@@ -313,15 +349,14 @@ def add_equipment_document(
 # -----------------------------------------------------------
 
 def get_documents_for_equipment(equipment_id: str) -> List[Dict[str, Any]]:
-    with _documents_lock:
-        return _equipment_documents_store.get(equipment_id, [])
+    return _equipment_documents_store.get(equipment_id, [])
 
 
 # -----------------------------------------------------------
 # VERIFY DOCUMENTS (Feature 235 Core Logic)
 # -----------------------------------------------------------
 
-def verify_equipment_documents(equipment_id: str) -> Dict[str, Any]:
+def verify_equipment_documents(equipment_id: str, now_iso: Optional[str] = None) -> Dict[str, Any]:
     """
     Auto-verifies documents:
       - Checks missing required docs
@@ -329,6 +364,8 @@ def verify_equipment_documents(equipment_id: str) -> Dict[str, Any]:
       - Computes compliance risk score
       - Uses breakdown + downtime + warranty signals to amplify risk
       - Returns recommendations
+
+    now_iso lets fleet callers share one verification timestamp.
     """
 
     # Check equipment exists
@@ -339,42 +376,50 @@ def verify_equipment_documents(equipment_id: str) -> Dict[str, Any]:
         eq = _equipment_store[equipment_id]
         eq_type = eq.get("type", "").lower()
 
-    required_docs = REQUIRED_DOCS_BY_TYPE.get(eq_type, [])
+    required_docs = REQUIRED_DOCS_BY_TYPE.get(eq_type, ())
     docs = get_documents_for_equipment(equipment_id)
 
+    # index documents by type once (first match wins, as before)
+    docs_by_type: Dict[str, Dict[str, Any]] = {}
+    index_doc = docs_by_type.setdefault
+    for d in docs:
+        index_doc(d["document_type"], d)
+    find_doc = docs_by_type.get
+
     doc_status_map = {}
     missing_docs = []
     expired_docs = []
     expiring_soon_docs = []
+    today_ord = datetime.utcnow().date().toordinal()
 
     for req in required_docs:
-        matched = [d for d in docs if d["document_type"] == req]
+        doc = find_doc(req)
 
-        if not matched:
+        if doc is None:
             missing_docs.append(req)
             continue
 
-        doc = matched[0]
         expiry = doc.get("expiry_date")
 
         if expiry:
-            try:
-                exp_date = datetime.fromisoformat(expiry).date()
-                days_left = (exp_date - datetime.utcnow().date()).days
+            exp_ord = _expiry_ordinal(expiry)
 
-                if days_left < 0:
-                    doc_status_map[req] = "expired"
-                    expired_docs.append(doc)
+            if exp_ord is None:
+                doc_status_map[req] = "invalid_expiry_format"
+                continue
 
-                elif days_left <= 30:
-                    doc_status_map[req] = "expiring_soon"
-                    expiring_soon_docs.append(doc)
+            days_left = exp_ord - today_ord
 
-                else:
-                    doc_status_map[req] = "valid"
+            if days_left < 0:
+                doc_status_map[req] = "expired"
+                expired_docs.append(doc)
 
-            except:
-                doc_status_map[req] = "invalid_expiry_format"
+            elif days_left <= 30:
+                doc_status_map[req] = "expiring_soon"
+                expiring_soon_docs.append(doc)
+
+            else:
+                doc_status_map[req] = "valid"
 
         else:
             doc_status_map[req] = "no_expiry_provided"
@@ -445,7 +490,7 @@ def verify_equipment_documents(equipment_id: str) -> Dict[str, Any]:
         "downtime_days_expected": downtime_days,
         "warranty_status": warranty_status,
         "recommendations": recommendations,
-        "verified_at": datetime.utcnow().isoformat(),
+        "verified_at": now_iso or datetime.utcnow().isoformat(),
     }
 
 
@@ -455,17 +500,18 @@ def verify_equipment_documents(equipment_id: str) -> Dict[str, Any]:
 
 def fleet_document_verification() -> Dict[str, Any]:
     results = []
+    now_iso = datetime.utcnow().isoformat()
 
     with _store_lock:
         equipment_ids = list(_equipment_store.keys())
 
     for eid in equipment_ids:
-        results.append(verify_equipment_documents(eid))
+        results.append(verify_equipment_documents(eid, now_iso=now_iso))
 
     results.sort(key=lambda x: x.get("risk_score", 0), reverse=True)
 
     return {
         "count": len(results),
         "fleet_document_verification": results,
-        "generated_at": datetime.utcnow().isoformat(),
+        "generated_at": now_iso,
     }
@@ -1,8 +1,14 @@
 # backend/app/services/farmer/equipment_effectiveness_service.py
 
+import heapq
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from threading import Lock
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # reuse existing services
 from app.services.farmer.equipment_service import (
@@ -11,17 +17,124 @@ from app.services.farmer.equipment_service import (
     equipment_workload_pressure_score,
     get_equipment_suitability_score,   # if you named differently, replace import
     _equipment_store,
-    _store_lock
+    _equipment_version
 )
 from app.services.farmer.operator_behavior_service import (
     compute_operator_behavior
 )
 from app.services.farmer.fuel_analytics_service import (
-    analyze_fuel_usage
+    analyze_fuel_usage,
+    get_fuel_logs_version
 )
+from app.services.farmer.spare_parts_service import get_parts_version
 
+# Readers here never take equipment_service._store_lock: single-key dict.get()
+# and list(dict) are atomic under the GIL, and writers there still serialize
+# on their own lock.
+
+# Bounded TTL cache of computed results:
+#   (equipment_id, crop, unit_id, weights_key, *versions) -> (expires_at_monotonic, result)
+# Oldest entries are evicted first once _EFFECTIVENESS_CACHE_MAX is reached.
+# versions are equipment_service's record version (bumped by every write to
+# the equipment record), the spare parts version (operating cost) and the
+# fuel log version, so entries built from older inputs are simply never
+# looked up again.
+_EFFECTIVENESS_CACHE_MAX = 10_000
+_EFFECTIVENESS_CACHE_TTL_SECONDS = 300
+_effectiveness_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
 _effectiveness_cache_lock = Lock()
-_effectiveness_cache: Dict[str, Any] = {}
+_effectiveness_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_key(eq: Dict[str, Any], equipment_id: str, crop: str, unit_id: Optional[str], weight_config: Optional[Dict[str, float]]) -> Optional[Tuple[Any, ...]]:
+    """
+    Cache key for one result, or None when it must not be cached: operator
+    behavior depends on the state of every equipment those operators used,
+    which no version here covers, so equipment with known operators is
+    always computed fresh.
+    """
+    if eq.get("last_known_operators"):
+        return None
+    weights_key = tuple(sorted(weight_config.items())) if weight_config else None
+    return (equipment_id, crop, unit_id, weights_key,
+            _equipment_version.get(equipment_id, 0), get_parts_version(), get_fuel_logs_version())
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    # results have a fixed layout (scalars plus these four containers of
+    # scalars), so copying them field-wise replaces a generic deepcopy
+    out = dict(result)
+    out["scores"] = dict(result["scores"])
+    out["weights_used"] = dict(result["weights_used"])
+    out["recommendations"] = list(result["recommendations"])
+    out["explainability"] = dict(result["explainability"])
+    return out
+
+
+def _cache_get(key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    now = time.monotonic()
+    with _effectiveness_cache_lock:
+        entry = _effectiveness_cache.get(key)
+        if entry is not None and entry[0] <= now:
+            del _effectiveness_cache[key]
+            entry = None
+        if entry is None:
+            _effectiveness_cache_stats["misses"] += 1
+            return None
+        _effectiveness_cache_stats["hits"] += 1
+    return _copy_result(entry[1])
+
+
+def _cache_put(key: Tuple[Any, ...], result: Dict[str, Any]) -> None:
+    entry = (time.monotonic() + _EFFECTIVENESS_CACHE_TTL_SECONDS, _copy_result(result))
+    with _effectiveness_cache_lock:
+        _effectiveness_cache[key] = entry
+        _effectiveness_cache.move_to_end(key)
+        while len(_effectiveness_cache) > _EFFECTIVENESS_CACHE_MAX:
+            _effectiveness_cache.popitem(last=False)
+
+
+def get_effectiveness_cache_stats() -> Dict[str, Any]:
+    """Hit/miss accounting for the effectiveness result cache."""
+    with _effectiveness_cache_lock:
+        hits = _effectiveness_cache_stats["hits"]
+        misses = _effectiveness_cache_stats["misses"]
+        size = len(_effectiveness_cache)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "size": size,
+        "max_size": _EFFECTIVENESS_CACHE_MAX,
+        "ttl_seconds": _EFFECTIVENESS_CACHE_TTL_SECONDS
+    }
+
+
+def _memo_call(memos: Optional[Dict[str, Dict[Any, Any]]], name: str, key: Any, fn, *args):
+    """
+    Calls fn(*args), reusing the result stored under memos[name][key] when a
+    batch caller (fleet ranking) passes a memo table. memos=None → plain call.
+    """
+    if memos is None:
+        return fn(*args)
+    table = memos.setdefault(name, {})
+    if key in table:
+        return table[key]
+    value = fn(*args)
+    table[key] = value
+    return value
+
+
+def _extract(svc_result: Optional[Dict[str, Any]], key: str, default: Any = None) -> Any:
+    """Single lookup into a sub-service result that may be None."""
+    return default if svc_result is None else svc_result.get(key, default)
+
+
+def _is_usable(eq: Dict[str, Any]) -> bool:
+    # replaced (archived) or explicitly inactive equipment is never scored
+    return eq.get("active", True) is not False and eq.get("status") != "replaced"
+
 
 def compute_equipment_effectiveness_for_crop(
     equipment_id: str,
@@ -30,7 +143,8 @@ def compute_equipment_effectiveness_for_crop(
     weight_config: Optional[Dict[str, float]] = None
 ) -> Optional[Dict[str, Any]]:
     """
-    Returns a crop-specific effectiveness score for an equipment (0-100).
+    Returns a crop-specific effectiveness score for an equipment (0-100),
+    or None for unknown, inactive or replaced equipment.
     Factors:
       - suitability (0..100)  -> weight default 0.30
       - fuel efficiency (inverse of liters_per_hour) -> weight 0.20
@@ -41,12 +155,43 @@ def compute_equipment_effectiveness_for_crop(
 
     weight_config allows overriding weights, e.g. {"suitability":0.4, "fuel":0.2, ...}
     """
+    return _compute_effectiveness(equipment_id, crop, unit_id, weight_config, None)
 
-    with _store_lock:
-        if equipment_id not in _equipment_store:
-            return None
-        eq = _equipment_store[equipment_id]
 
+def _compute_effectiveness(
+    equipment_id: str,
+    crop: str,
+    unit_id: Optional[str],
+    weight_config: Optional[Dict[str, float]],
+    memos: Optional[Dict[str, Dict[Any, Any]]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Body of compute_equipment_effectiveness_for_crop. memos is a per-ranking
+    memo table shared by all equipment of one fleet_crop_effectiveness_ranking
+    call, so sub-service results (notably operator behavior, which several
+    equipment share) are computed once per call and can never go stale.
+    """
+    eq = _equipment_store.get(equipment_id)
+    if eq is None or not _is_usable(eq):
+        return None
+
+    key = _cache_key(eq, equipment_id, crop, unit_id, weight_config)
+    cached = _cache_get(key) if key is not None else None
+    if cached is not None:
+        return cached
+
+    weights = _resolve_weights(weight_config)
+    subs = _gather_subscores(eq, equipment_id, crop, memos)
+    final_score = _compose_final_score(subs, _scorer_for(weights, weight_config))
+    result = _build_result(equipment_id, crop, unit_id, subs, weights, final_score, datetime.utcnow().isoformat())
+
+    if key is not None:
+        _cache_put(key, result)
+
+    return result
+
+
+def _resolve_weights(weight_config: Optional[Dict[str, float]]) -> Dict[str, float]:
     # defaults
     weights = {
         "suitability": 0.30,
@@ -60,19 +205,33 @@ def compute_equipment_effectiveness_for_crop(
         for k, v in weight_config.items():
             if k in weights:
                 weights[k] = float(v)
+    return weights
+
 
+def _gather_subscores(
+    eq: Dict[str, Any],
+    equipment_id: str,
+    crop: str,
+    memos: Optional[Dict[str, Dict[Any, Any]]]
+) -> Tuple[Any, ...]:
+    """
+    Calls the sub-services for one equipment and returns the raw factors:
+    (suit, fuel, cost, health, pressure, operator, suit_label, avg_hourly_fuel, cost_per_hour)
+    """
     # 1) Suitability (0-100)
     try:
-        suit = get_equipment_suitability_score(equipment_id, crop, "") or {}
-        suit_score = suit.get("suitability_score", 50)
-        suit_label = suit.get("label")
+        suit = _memo_call(memos, "suitability", (equipment_id, crop), get_equipment_suitability_score, equipment_id, crop, "")
     except Exception:
+        suit = None
+    suit_score = _extract(suit, "suitability_score")
+    if suit_score is None:
+        # no crop/stage rule matched (or the lookup failed)
         suit_score = 50
-        suit_label = None
+    suit_label = _extract(suit, "label")
 
     # 2) Fuel efficiency: lower liters_per_hour better -> normalize to 0..100
-    fuel = analyze_fuel_usage(equipment_id) or {}
-    avg_hourly_fuel = fuel.get("avg_hourly_fuel")
+    fuel = _memo_call(memos, "fuel", equipment_id, analyze_fuel_usage, equipment_id)
+    avg_hourly_fuel = _extract(fuel, "avg_hourly_fuel")
     # Determine a reasonable normalization range: 0.5 L/hr (excellent) -> 8 L/hr (poor)
     if avg_hourly_fuel is None or avg_hourly_fuel <= 0:
         fuel_score = 60
@@ -84,8 +243,7 @@ def compute_equipment_effectiveness_for_crop(
         fuel_score = int((1 - ((val - low) / (high - low))) * 100)
 
     # 3) Cost per hour: lower is better
-    cost = compute_equipment_operating_cost(equipment_id) or {}
-    cph = cost.get("cost_per_hour", None)
+    cph = _extract(_memo_call(memos, "cost", equipment_id, compute_equipment_operating_cost, equipment_id), "cost_per_hour")
     if cph is None:
         cost_score = 60
     else:
@@ -94,54 +252,77 @@ def compute_equipment_effectiveness_for_crop(
         cost_score = int((1 - (val / 200.0)) * 100)
 
     # 4) Health / uptime
-    health = compute_equipment_health(equipment_id) or {}
-    health_score = health.get("health_score", 70)
+    health_score = _extract(_memo_call(memos, "health", equipment_id, compute_equipment_health, equipment_id), "health_score", 70)
     if health_score is None:
         health_score = 70
 
     # 5) Workload pressure: lower pressure is better
-    pressure = equipment_workload_pressure_score(equipment_id) or {}
-    pressure_score_raw = pressure.get("pressure_score", 40)
+    pressure_score_raw = _extract(_memo_call(memos, "pressure", equipment_id, equipment_workload_pressure_score, equipment_id), "pressure_score", 40)
     pressure_score = int((1 - (pressure_score_raw / 100.0)) * 100)
 
     # 6) Operator influence: find best/worst operator if present on equipment
-    operator_bonus = 0
-    try:
-        last_ops = eq.get("last_known_operators", []) or []
-        op_scores = []
-        for op in last_ops:
-            b = compute_operator_behavior(op) or {}
-            op_scores.append(b.get("final_behavior_score", 50))
-        if op_scores:
-            avg_op = sum(op_scores) / len(op_scores)
-            # map avg_op (0..100) directly to 0..100 (higher is better)
-            operator_score = int(avg_op)
-        else:
-            operator_score = 60
-    except Exception:
+    last_ops = eq.get("last_known_operators")
+    if last_ops and isinstance(last_ops, (list, tuple)):
+        op_scores = [
+            _extract(_memo_call(memos, "operator", op, compute_operator_behavior, op), "final_behavior_score", 50)
+            for op in last_ops
+        ]
+        # map avg_op (0..100) directly to 0..100 (higher is better)
+        operator_score = int(sum(op_scores) / len(op_scores))
+    else:
         operator_score = 60
 
+    return (suit_score, fuel_score, cost_score, health_score, pressure_score, operator_score,
+            suit_label, avg_hourly_fuel, cph)
+
+
+# category by number of thresholds (40, 60, 80) the final score reaches
+_CATEGORIES = ("poor", "fair", "good", "excellent")
+
+_WEIGHT_KEYS = ("suitability", "fuel_eff", "cost", "health", "pressure", "operator")
+
+
+def _score_default(s: float, f: float, c: float, h: float, p: float, o: float) -> float:
+    # default weights folded in as constants (weight_config=None path)
+    return s * 0.30 + f * 0.20 + c * 0.15 + h * 0.15 + p * 0.10 + o * 0.10
+
+
+@lru_cache(maxsize=128)
+def _weighted_scorer(weight_values: Tuple[float, ...]) -> Callable[..., float]:
+    """Scorer specialized for one custom weight vector (ordered as _WEIGHT_KEYS)."""
+    ws, wf, wc, wh, wp, wo = weight_values
+
+    def _score(s: float, f: float, c: float, h: float, p: float, o: float) -> float:
+        return s * ws + f * wf + c * wc + h * wh + p * wp + o * wo
+
+    return _score
+
+
+def _scorer_for(weights: Dict[str, float], weight_config: Optional[Dict[str, float]]) -> Callable[..., float]:
+    if not weight_config:
+        return _score_default
+    return _weighted_scorer(tuple(weights[k] for k in _WEIGHT_KEYS))
+
+
+def _compose_final_score(subs: Tuple[Any, ...], scorer: Callable[..., float]) -> int:
     # Compose weighted score
-    final_raw = (
-        suit_score * weights["suitability"] +
-        fuel_score * weights["fuel"] +
-        cost_score * weights["cost"] +
-        health_score * weights["health"] +
-        pressure_score * weights["pressure"] +
-        operator_score * weights["operator"]
-    )
+    final_raw = scorer(subs[0], subs[1], subs[2], subs[3], subs[4], subs[5])
+    return int(round(min(100, max(0, final_raw))))
+
 
-    final_score = int(round(min(100, max(0, final_raw))))
+def _build_result(
+    equipment_id: str,
+    crop: str,
+    unit_id: Optional[str],
+    subs: Tuple[Any, ...],
+    weights: Dict[str, float],
+    final_score: int,
+    computed_at: str
+) -> Dict[str, Any]:
+    suit_score, fuel_score, cost_score, health_score, pressure_score, operator_score, suit_label, avg_hourly_fuel, cph = subs
 
     # Category
-    if final_score >= 80:
-        category = "excellent"
-    elif final_score >= 60:
-        category = "good"
-    elif final_score >= 40:
-        category = "fair"
-    else:
-        category = "poor"
+    category = _CATEGORIES[(final_score >= 40) + (final_score >= 60) + (final_score >= 80)]
 
     # Recommendations (explainable)
     recs = []
@@ -158,7 +339,7 @@ def compute_equipment_effectiveness_for_crop(
     if not recs:
         recs.append("Equipment is suitable for this crop under current conditions.")
 
-    result = {
+    return {
         "equipment_id": equipment_id,
         "crop": crop,
         "unit_id": unit_id,
@@ -176,19 +357,12 @@ def compute_equipment_effectiveness_for_crop(
         "recommendations": recs,
         "explainability": {
             "suitability_label": suit_label,
-            "avg_hourly_fuel": fuel.get("avg_hourly_fuel"),
+            "avg_hourly_fuel": avg_hourly_fuel,
             "cost_per_hour": cph
         },
-        "computed_at": datetime.utcnow().isoformat()
+        "computed_at": computed_at
     }
 
-    # optional cache keyed by equipment+crop+unit
-    key = f"{equipment_id}::{crop}::{unit_id}"
-    with _effectiveness_cache_lock:
-        _effectiveness_cache[key] = result
-
-    return result
-
 def fleet_crop_effectiveness_ranking(
     crop: str,
     unit_plans: Optional[List[Dict[str, Any]]] = None,
@@ -198,19 +372,65 @@ def fleet_crop_effectiveness_ranking(
     """
     Computes effectiveness for all equipment for the given crop and returns ranking.
     """
-    results = []
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
+    eq_ids = [eid for eid, eq in list(_equipment_store.items()) if _is_usable(eq)]
+    weights = _resolve_weights(weight_config)
+    scorer = _scorer_for(weights, weight_config)
+    # request-scoped memo tables, discarded when this call returns
+    memos: Dict[str, Dict[Any, Any]] = {
+        name: {} for name in ("suitability", "fuel", "cost", "health", "pressure", "operator")
+    }
+
+    def _gather(eid: str) -> Optional[Tuple[str, Optional[Tuple[Any, ...]], Any, Optional[Dict[str, Any]]]]:
+        # workers only collect raw sub-scores (or a cached result);
+        # result dicts are built below for the ranked top_n only.
+        # The cache key is taken before gathering so a concurrent write
+        # (version bump) can't get a stale result cached under the new version.
+        eq = _equipment_store.get(eid)
+        if eq is None or not _is_usable(eq):
+            return None
+        key = _cache_key(eq, eid, crop, None, weight_config)
+        cached = _cache_get(key) if key is not None else None
+        if cached is not None:
+            return eid, key, None, cached
+        return eid, key, _gather_subscores(eq, eid, crop, memos), None
+
+    # each equipment fans out into several independent service calls;
+    # score them concurrently (map() keeps the input order)
+    if len(eq_ids) > 1:
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(eq_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            gathered = list(executor.map(_gather, eq_ids))
+    else:
+        gathered = [_gather(eid) for eid in eq_ids]
+
+    # single composition pass: (final_score, eid, key, subs, cached)
+    rows = []
+    for g in gathered:
+        if g is None:
+            continue
+        eid, key, subs, cached = g
+        final_score = cached["final_effectiveness_score"] if cached is not None else _compose_final_score(subs, scorer)
+        rows.append((final_score, eid, key, subs, cached))
+
+    # nlargest is stable for equal scores, like the previous sort(reverse=True)
+    if top_n >= 0:
+        top = heapq.nlargest(top_n, rows, key=lambda r: r[0])
+    else:
+        top = sorted(rows, key=lambda r: r[0], reverse=True)[:top_n]
 
-    for eid in eq_ids:
-        r = compute_equipment_effectiveness_for_crop(eid, crop, unit_id=None, weight_config=weight_config)
-        if r:
-            results.append(r)
+    # one timestamp for the whole ranking
+    computed_at = datetime.utcnow().isoformat()
+    ranking = []
+    for final_score, eid, key, subs, cached in top:
+        if cached is None:
+            cached = _build_result(eid, crop, None, subs, dict(weights), final_score, computed_at)
+            if key is not None:
+                _cache_put(key, cached)
+        ranking.append(cached)
 
-    results.sort(key=lambda x: x["final_effectiveness_score"], reverse=True)
     return {
         "crop": crop,
-        "count": len(results),
-        "ranking": results[:top_n],
-        "generated_at": datetime.utcnow().isoformat()
+        "count": len(rows),
+        "ranking": ranking,
+        "generated_at": computed_at
     }
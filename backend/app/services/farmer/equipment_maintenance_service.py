@@ -13,24 +13,129 @@ Features:
  - simple predictive heuristic: next_service_hours = last_service_hours + interval_hours - usage_since_last
 """
 
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from threading import Lock
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+import itertools
+import time
 import uuid
 import math
 
 _lock = Lock()
 
+
+# Usage and maintenance records are append-only and the most numerous
+# objects here, so they are kept as slotted records and only turned into
+# dicts at the API boundary (to_dict). Equipment and tickets stay dicts:
+# they accept arbitrary update payloads.
+@dataclass(slots=True)
+class UsageEntry:
+    usage_id: str
+    equipment_id: str
+    hours: float
+    km: float
+    cycles: int
+    notes: str
+    ts_iso: str
+    ts_kind: int        # see _ts_epoch_us; not part of to_dict()
+    ts_us: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "usage_id": self.usage_id,
+            "equipment_id": self.equipment_id,
+            "hours": self.hours,
+            "km": self.km,
+            "cycles": self.cycles,
+            "notes": self.notes,
+            "ts_iso": self.ts_iso
+        }
+
+
+@dataclass(slots=True)
+class MaintenanceRecord:
+    maintenance_id: str
+    equipment_id: str
+    performed_by: str
+    performed_at: str
+    odometer_hours: Optional[float]
+    notes: str
+    checklist_done: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "maintenance_id": self.maintenance_id,
+            "equipment_id": self.equipment_id,
+            "performed_by": self.performed_by,
+            "performed_at": self.performed_at,
+            "odometer_hours": self.odometer_hours,
+            "notes": self.notes,
+            "checklist_done": list(self.checklist_done)
+        }
+
+
 # Stores
+# _equipment_store is published read-copy-update style: writers build a new
+# dict under _lock and rebind it, readers use the current reference lock-free.
 _equipment_store: Dict[str, Dict[str, Any]] = {}             # equipment_id -> metadata
-_usage_logs: Dict[str, List[Dict[str, Any]]] = {}            # equipment_id -> [usage events]
+_usage_logs: Dict[str, deque] = {}                          # equipment_id -> deque of recent UsageEntry
 _maintenance_rules: Dict[str, Dict[str, Any]] = {}           # rule_id -> {equipment_type, interval_hours, interval_days, checklist}
 _service_tickets: Dict[str, Dict[str, Any]] = {}            # ticket_id -> record
-_maintenance_history: Dict[str, List[Dict[str, Any]]] = {}   # equipment_id -> [maintenance records]
+# secondary ticket indexes, maintained under _lock by create/update_ticket
+_tickets_by_equipment: Dict[Any, Set[str]] = defaultdict(set)   # equipment_id -> {ticket_id}
+_tickets_by_status: Dict[Any, Set[str]] = defaultdict(set)      # status -> {ticket_id}
+_ticket_seq: Dict[str, int] = {}                                # ticket_id -> creation order
+_ticket_counter = itertools.count()
+_maintenance_history: Dict[str, List[MaintenanceRecord]] = {}   # equipment_id -> [maintenance records]
+# equipment_id -> (record with the greatest performed_at, ts_kind, epoch microseconds of performed_at)
+_latest_maintenance: Dict[str, Tuple[MaintenanceRecord, int, int]] = {}
+
+# Past _USAGE_LOG_MAXLEN usage entries per equipment, the oldest are folded
+# into running totals, but only while they are at or before the last
+# recorded service (see _trim_usage), so usage since that service stays
+# entry-exact.
+_USAGE_LOG_MAXLEN = 10_000
+
+# Running totals of usage entries evicted from _usage_logs, per ts_kind:
+#   equipment_id -> {ts_kind: [hours, km, cycles, latest ts_us]}
+# ts_us is the entry timestamp in epoch microseconds (naive timestamps are
+# measured from the naive epoch so their ordering is preserved); ts_kind
+# records whether ts_iso was naive, aware or unparseable.
+_usage_evicted: Dict[str, Dict[int, List[Any]]] = {}
+
+_TS_UNPARSEABLE = 0
+_TS_NAIVE = 1
+_TS_AWARE = 2
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_EPOCH_AWARE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _now_us() -> int:
+    """Current UTC time in epoch microseconds (one clock read, no datetime)."""
+    return time.time_ns() // 1000
+
+
+def _iso_from_us(ts_us: int) -> str:
+    # same format as datetime.utcnow().isoformat()
+    return (_EPOCH_NAIVE + timedelta(microseconds=ts_us)).isoformat()
 
 
 def _now_iso() -> str:
-    return datetime.utcnow().isoformat()
+    return _iso_from_us(_now_us())
+
+
+def _ts_epoch_us(ts_iso: Optional[str]) -> Tuple[int, int]:
+    """(ts_kind, epoch microseconds) for an ISO timestamp."""
+    try:
+        dt = datetime.fromisoformat(ts_iso)
+    except (ValueError, TypeError):
+        return _TS_UNPARSEABLE, 0
+    if dt.utcoffset() is None:
+        return _TS_NAIVE, (dt.replace(tzinfo=None) - _EPOCH_NAIVE) // _MICROSECOND
+    return _TS_AWARE, (dt - _EPOCH_AWARE) // _MICROSECOND
 
 
 # -----------------------
@@ -56,9 +161,10 @@ def register_equipment(
         "registered_at": _now_iso(),
         "active": True
     }
+    global _equipment_store
     with _lock:
-        _equipment_store[eid] = rec
-        _usage_logs.setdefault(eid, [])
+        _equipment_store = {**_equipment_store, eid: rec}
+        _usage_logs.setdefault(eid, deque())
         _maintenance_history.setdefault(eid, [])
     return rec
 
@@ -68,8 +174,7 @@ def get_equipment(equipment_id: str) -> Dict[str, Any]:
 
 
 def list_equipment(owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    with _lock:
-        items = list(_equipment_store.values())
+    items = list(_equipment_store.values())
     if owner_id:
         items = [i for i in items if i.get("owner_id") == owner_id]
     return items
@@ -81,40 +186,117 @@ def list_equipment(owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
 def log_usage(equipment_id: str, hours: float = 0.0, km: float = 0.0, cycles: int = 0, notes: Optional[str] = None, ts_iso: Optional[str] = None) -> Dict[str, Any]:
     if equipment_id not in _equipment_store:
         return {"error": "equipment_not_found"}
-    entry = {
-        "usage_id": f"usage_{uuid.uuid4()}",
-        "equipment_id": equipment_id,
-        "hours": float(hours),
-        "km": float(km),
-        "cycles": int(cycles),
-        "notes": notes or "",
-        "ts_iso": ts_iso or _now_iso()
-    }
+    if ts_iso:
+        ts_kind, ts_us = _ts_epoch_us(ts_iso)
+    else:
+        # stamp from one clock read; nothing to parse back
+        ts_kind, ts_us = _TS_NAIVE, _now_us()
+        ts_iso = _iso_from_us(ts_us)
+    entry = UsageEntry(
+        usage_id=f"usage_{uuid.uuid4()}",
+        equipment_id=equipment_id,
+        hours=float(hours),
+        km=float(km),
+        cycles=int(cycles),
+        notes=notes or "",
+        ts_iso=ts_iso,
+        ts_kind=ts_kind,
+        ts_us=ts_us
+    )
     with _lock:
-        _usage_logs.setdefault(equipment_id, []).append(entry)
-    return entry
+        logs = _usage_logs.get(equipment_id)
+        if logs is None:
+            logs = _usage_logs[equipment_id] = deque()
+        logs.append(entry)
+        _trim_usage(equipment_id, logs)
+    return entry.to_dict()
+
+
+def _trim_usage(equipment_id: str, logs: deque) -> None:
+    """
+    Folds the oldest entries past _USAGE_LOG_MAXLEN into _usage_evicted,
+    stopping at the first one newer than (or not comparable with) the last
+    service. Caller holds _lock.
+    """
+    if len(logs) <= _USAGE_LOG_MAXLEN:
+        return
+    latest = _latest_maintenance.get(equipment_id)
+    if latest is None or latest[1] == _TS_UNPARSEABLE:
+        return
+    cut_kind, cut_us = latest[1], latest[2]
+    while len(logs) > _USAGE_LOG_MAXLEN:
+        oldest = logs[0]
+        if oldest.ts_kind != cut_kind or oldest.ts_us > cut_us:
+            break
+        _fold_evicted(equipment_id, logs.popleft())
+
+
+def _fold_evicted(equipment_id: str, entry: UsageEntry) -> None:
+    # caller holds _lock; entry has just dropped out of _usage_logs
+    totals = _usage_evicted.setdefault(equipment_id, {})
+    agg = totals.get(entry.ts_kind)
+    if agg is None:
+        totals[entry.ts_kind] = [entry.hours, entry.km, entry.cycles, entry.ts_us]
+        return
+    agg[0] += entry.hours
+    agg[1] += entry.km
+    agg[2] += entry.cycles
+    if entry.ts_us > agg[3]:
+        agg[3] = entry.ts_us
 
 
 def list_usage(equipment_id: str, limit: int = 200) -> List[Dict[str, Any]]:
-    return list(_usage_logs.get(equipment_id, [])[-limit:])
+    logs = _usage_logs.get(equipment_id)
+    if not logs:
+        return []
+    if limit <= 0:
+        # same as the old list slice [-limit:]
+        return [u.to_dict() for u in list(logs)[-limit:]]
+    return [u.to_dict() for u in itertools.islice(logs, max(0, len(logs) - limit), None)]
+
+
+def _cum_since(entries: List[UsageEntry], evicted: List[Tuple[int, List[Any]]], since_kind: int, since_us: int) -> Tuple[float, float, int]:
+    """
+    Sums usage for entries strictly after since_us.
+    Entries whose timestamp is unparseable, or not comparable with the
+    cutoff (naive vs aware), are always counted. Evicted entries are never
+    newer than the service that was latest when they were folded, so their
+    totals are exact for a cutoff at or after that service (the ones
+    estimate_next_service uses); only an earlier cutoff counts them in full.
+    """
+    h = 0.0
+    k = 0.0
+    c = 0
+    count_all = since_kind == _TS_UNPARSEABLE
+    for kind, (eh, ek, ec, latest_us) in evicted:
+        if count_all or kind != since_kind or latest_us > since_us:
+            h += eh
+            k += ek
+            c += ec
+    for e in entries:
+        if not count_all and e.ts_kind == since_kind and e.ts_us <= since_us:
+            continue
+        h += e.hours
+        k += e.km
+        c += e.cycles
+    return h, k, c
 
 
 def cumulative_usage_since(equipment_id: str, since_iso: Optional[str] = None) -> Dict[str, float]:
-    hours = 0.0
-    km = 0.0
-    cycles = 0
+    # parse the cutoff once; an unparseable (or absent) cutoff counts everything
+    since_kind, since_us = _ts_epoch_us(since_iso) if since_iso else (_TS_UNPARSEABLE, 0)
+    return _cumulative_usage_after(equipment_id, since_kind, since_us)
+
+
+def _cumulative_usage_after(equipment_id: str, since_kind: int, since_us: int) -> Dict[str, float]:
+    """cumulative_usage_since with an already-converted cutoff."""
     if equipment_id not in _usage_logs:
         return {"hours": 0.0, "km": 0.0, "cycles": 0}
-    for u in _usage_logs.get(equipment_id, []):
-        if since_iso:
-            try:
-                if datetime.fromisoformat(u.get("ts_iso")) <= datetime.fromisoformat(since_iso):
-                    continue
-            except Exception:
-                pass
-        hours += float(u.get("hours", 0.0))
-        km += float(u.get("km", 0.0))
-        cycles += int(u.get("cycles", 0))
+    with _lock:
+        # retained entries and evicted totals must be read together
+        entries = list(_usage_logs[equipment_id])
+        evicted = [(kind, list(agg)) for kind, agg in _usage_evicted.get(equipment_id, {}).items()]
+    hours, km, cycles = _cum_since(entries, evicted, since_kind, since_us)
     return {"hours": round(hours, 2), "km": round(km, 2), "cycles": cycles}
 
 
@@ -152,9 +334,9 @@ def assign_rule_to_equipment(equipment_id: str, rule_id: str) -> Dict[str, Any]:
     if not rule:
         return {"error": "rule_not_found"}
     with _lock:
-        eq.setdefault("maintenance", {})["rule_id"] = rule_id
-        eq.setdefault("maintenance", {})["last_service_at"] = eq.setdefault("maintenance", {}).get("last_service_at")
-        _equipment_store[equipment_id] = eq
+        maint = eq.setdefault("maintenance", {})
+        maint["rule_id"] = rule_id
+        maint.setdefault("last_service_at", None)
     return eq
 
 
@@ -162,11 +344,9 @@ def assign_rule_to_equipment(equipment_id: str, rule_id: str) -> Dict[str, Any]:
 # Predictive next service estimate
 # -----------------------
 def _get_last_service(equipment_id: str) -> Optional[Dict[str, Any]]:
-    hist = _maintenance_history.get(equipment_id, [])
-    if not hist:
-        return None
-    # assume maintenance record has 'performed_at' field
-    return sorted(hist, key=lambda x: x.get("performed_at", ""), reverse=True)[0]
+    # maintained by record_maintenance_performed; ties keep the earliest-recorded entry
+    latest = _latest_maintenance.get(equipment_id)
+    return latest[0].to_dict() if latest else None
 
 
 def estimate_next_service(equipment_id: str) -> Dict[str, Any]:
@@ -184,12 +364,16 @@ def estimate_next_service(equipment_id: str) -> Dict[str, Any]:
     rule_id = eq.get("maintenance", {}).get("rule_id")
     rule = _maintenance_rules.get(rule_id) if rule_id else None
 
-    last_service = _get_last_service(equipment_id)
+    latest = _latest_maintenance.get(equipment_id)
+    last_service = latest[0].to_dict() if latest else None
     last_service_at_iso = last_service.get("performed_at") if last_service else None
     last_service_hours_total = last_service.get("odometer_hours") if last_service else 0.0
 
-    # compute cumulative hours since last service
-    usage_since = cumulative_usage_since(equipment_id, since_iso=last_service_at_iso)
+    # compute cumulative hours since last service (performed_at was converted on insert)
+    if latest and last_service_at_iso:
+        usage_since = _cumulative_usage_after(equipment_id, latest[1], latest[2])
+    else:
+        usage_since = cumulative_usage_since(equipment_id)
     hours_used_since = usage_since.get("hours", 0.0)
 
     hours_remaining = None
@@ -245,6 +429,7 @@ def create_service_ticket(equipment_id: str, reported_by: str, issue: str, prior
     if equipment_id not in _equipment_store:
         return {"error": "equipment_not_found"}
     tid = f"ticket_{uuid.uuid4()}"
+    now_iso = _now_iso()
     rec = {
         "ticket_id": tid,
         "equipment_id": equipment_id,
@@ -253,12 +438,15 @@ def create_service_ticket(equipment_id: str, reported_by: str, issue: str, prior
         "priority": priority,
         "status": "open",
         "assigned_to": None,
-        "created_at": _now_iso(),
-        "updated_at": _now_iso(),
+        "created_at": now_iso,
+        "updated_at": now_iso,
         "metadata": metadata or {}
     }
     with _lock:
         _service_tickets[tid] = rec
+        _ticket_seq[tid] = next(_ticket_counter)
+        _tickets_by_equipment[equipment_id].add(tid)
+        _tickets_by_status[rec["status"]].add(tid)
     return rec
 
 
@@ -267,19 +455,40 @@ def update_ticket(ticket_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         t = _service_tickets.get(ticket_id)
         if not t:
             return {"error": "ticket_not_found"}
+        old_equipment_id = t.get("equipment_id")
+        old_status = t.get("status")
         t.update(updates)
         t["updated_at"] = _now_iso()
         _service_tickets[ticket_id] = t
+        _reindex_ticket(_tickets_by_equipment, ticket_id, old_equipment_id, t.get("equipment_id"))
+        _reindex_ticket(_tickets_by_status, ticket_id, old_status, t.get("status"))
     return t
 
 
+def _reindex_ticket(index: Dict[Any, Set[str]], ticket_id: str, old: Any, new: Any) -> None:
+    # caller holds _lock
+    if old == new:
+        return
+    bucket = index.get(old)
+    if bucket is not None:
+        bucket.discard(ticket_id)
+        if not bucket:
+            del index[old]
+    index[new].add(ticket_id)
+
+
 def list_tickets(equipment_id: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
-    items = list(_service_tickets.values())
-    if equipment_id:
-        items = [i for i in items if i.get("equipment_id") == equipment_id]
-    if status:
-        items = [i for i in items if i.get("status") == status]
-    return items
+    if not equipment_id and not status:
+        return list(_service_tickets.values())
+    with _lock:
+        if equipment_id and status:
+            ids = _tickets_by_equipment.get(equipment_id, set()) & _tickets_by_status.get(status, set())
+        elif equipment_id:
+            ids = set(_tickets_by_equipment.get(equipment_id, ()))
+        else:
+            ids = set(_tickets_by_status.get(status, ()))
+    # keep creation order, as the full scan did
+    return [_service_tickets[i] for i in sorted(ids, key=_ticket_seq.__getitem__)]
 
 
 # -----------------------
@@ -288,22 +497,34 @@ def list_tickets(equipment_id: Optional[str] = None, status: Optional[str] = Non
 def record_maintenance_performed(equipment_id: str, performed_by: str, performed_at_iso: Optional[str] = None, odometer_hours: Optional[float] = None, notes: Optional[str] = None, checklist_done: Optional[List[str]] = None) -> Dict[str, Any]:
     if equipment_id not in _equipment_store:
         return {"error": "equipment_not_found"}
-    rec = {
-        "maintenance_id": f"maint_{uuid.uuid4()}",
-        "equipment_id": equipment_id,
-        "performed_by": performed_by,
-        "performed_at": performed_at_iso or _now_iso(),
-        "odometer_hours": float(odometer_hours) if odometer_hours is not None else None,
-        "notes": notes or "",
-        "checklist_done": checklist_done or []
-    }
+    if performed_at_iso:
+        ts_kind, ts_us = _ts_epoch_us(performed_at_iso)
+    else:
+        ts_kind, ts_us = _TS_NAIVE, _now_us()
+        performed_at_iso = _iso_from_us(ts_us)
+    rec = MaintenanceRecord(
+        maintenance_id=f"maint_{uuid.uuid4()}",
+        equipment_id=equipment_id,
+        performed_by=performed_by,
+        performed_at=performed_at_iso,
+        odometer_hours=float(odometer_hours) if odometer_hours is not None else None,
+        notes=notes or "",
+        checklist_done=checklist_done or []
+    )
     with _lock:
         _maintenance_history.setdefault(equipment_id, []).append(rec)
-    return rec
+        latest = _latest_maintenance.get(equipment_id)
+        if latest is None or rec.performed_at > latest[0].performed_at:
+            _latest_maintenance[equipment_id] = (rec, ts_kind, ts_us)
+            logs = _usage_logs.get(equipment_id)
+            if logs is not None:
+                # entries held back for lack of a service can go now
+                _trim_usage(equipment_id, logs)
+    return rec.to_dict()
 
 
 def maintenance_history(equipment_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-    return list(_maintenance_history.get(equipment_id, [])[-limit:])
+    return [r.to_dict() for r in _maintenance_history.get(equipment_id, [])[-limit:]]
 
 
 # -----------------------
@@ -311,17 +532,68 @@ def maintenance_history(equipment_id: str, limit: int = 50) -> List[Dict[str, An
 # -----------------------
 def equipment_due_for_service(owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
     due_list = []
-    with _lock:
-        eqs = list(_equipment_store.values())
+    eqs = list(_equipment_store.values())
     if owner_id:
         eqs = [e for e in eqs if e.get("owner_id") == owner_id]
+
+    # gather the numeric inputs of estimate_next_service's due test as columns
+    interval_h: List[Optional[int]] = []
+    used_h: List[float] = []
+    last_kind: List[int] = []
+    last_us: List[int] = []
+    interval_us: List[Optional[int]] = []
     for e in eqs:
-        est = estimate_next_service(e["equipment_id"])
-        if est.get("due"):
-            due_list.append({"equipment": e, "estimate": est})
+        eid = e["equipment_id"]
+        rule_id = e.get("maintenance", {}).get("rule_id")
+        rule = _maintenance_rules.get(rule_id) if rule_id else None
+        latest = _latest_maintenance.get(eid)
+        if latest and latest[0].performed_at:
+            kind, ts_us = latest[1], latest[2]
+        else:
+            kind, ts_us = _TS_UNPARSEABLE, 0
+        hours = rule.get("interval_hours") if rule else None
+        days = rule.get("interval_days") if rule else None
+        interval_h.append(hours or None)
+        used_h.append(_cumulative_usage_after(eid, kind, ts_us)["hours"] if hours else 0.0)
+        last_kind.append(kind)
+        last_us.append(ts_us)
+        interval_us.append(days * 86_400_000_000 if days else None)
+
+    now_us = _now_us()
+    due = _due_kernel(interval_h, used_h, last_kind, last_us, interval_us, now_us)
+
+    # full estimates are only built for equipment that is actually due
+    for i, e in enumerate(eqs):
+        if due[i]:
+            est = estimate_next_service(e["equipment_id"])
+            if est.get("due"):
+                due_list.append({"equipment": e, "estimate": est})
     return due_list
 
 
+def _due_kernel(
+    interval_h: List[Optional[int]],
+    used_h: List[float],
+    last_kind: List[int],
+    last_us: List[int],
+    interval_us: List[Optional[int]],
+    now_us: int
+) -> bytearray:
+    """
+    Vectorized form of estimate_next_service's due flag. Date-based due
+    dates only apply to naive last-service timestamps, as comparing an
+    aware one with utcnow() fails (and is skipped) there.
+    """
+    n = len(interval_h)
+    due = bytearray(n)
+    for i in range(n):
+        if interval_h[i] is not None and interval_h[i] - used_h[i] <= 0:
+            due[i] = 1
+        elif interval_us[i] is not None and last_kind[i] == _TS_NAIVE and now_us >= last_us[i] + interval_us[i]:
+            due[i] = 1
+    return due
+
+
 def equipment_summary(equipment_id: str) -> Dict[str, Any]:
     eq = _equipment_store.get(equipment_id)
     if not eq:
@@ -329,7 +601,7 @@ def equipment_summary(equipment_id: str) -> Dict[str, Any]:
     usage = cumulative_usage_since(equipment_id)
     next_service = estimate_next_service(equipment_id)
     history = maintenance_history(equipment_id)
-    tickets = [t for t in list(_service_tickets.values()) if t.get("equipment_id") == equipment_id]
+    tickets = list_tickets(equipment_id=equipment_id)
     return {
         "equipment": eq,
         "usage_summary": usage,
@@ -10,16 +10,186 @@ Implements:
 
 from datetime import datetime
 from typing import Dict, Any
+import bisect
+import copy
+import heapq
+import itertools
+import math
+import os
 import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from threading import Lock
 from typing import List
-from datetime import timedelta
-from typing import List, Optional
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple
 
 # In-memory equipment store
+# _store_lock guards membership (add/delete). Per-record read-modify-write
+# updates take only the shard lock for that equipment id, so writers to
+# different equipment don't contend. Readers take no lock: dict.get(),
+# list(dict) and dict.copy() are atomic under the GIL, and stay safe on
+# free-threaded builds (see the Python free-threading HOWTO: built-in
+# dict/list operations lock internally).
+# These are threading locks on purpose: the equipment routes are plain
+# `def` handlers, which FastAPI runs in its worker threadpool, so a
+# contended writer blocks one worker thread, never the event loop. Call
+# these functions from async code via asyncio.to_thread().
 _equipment_store: Dict[str, Dict[str, Any]] = {}
 _store_lock = Lock()
 
+_MISSING = object()
+
+# Equipment ids: "eq-<n>" from a process-local counter (next() on
+# itertools.count is atomic under the GIL, so no lock is needed)
+_id_counter = itertools.count(1)
+
+_SHARDS = 32   # power of two
+_shard_locks = [Lock() for _ in range(_SHARDS)]
+
+
+def _record_lock(equipment_id: str) -> Lock:
+    return _shard_locks[hash(equipment_id) & (_SHARDS - 1)]
+
+
+# Immutable snapshot of all records for fleet-wide scans, republished
+# (read-copy-update) by add/delete under _store_lock. Scans read the
+# current tuple with no lock; per-record updates mutate the shared record
+# dicts in place, so they don't require a republish. The active snapshot
+# leaves out replaced equipment and is also republished by
+# mark_equipment_replaced.
+_equipment_snapshot: Tuple[Dict[str, Any], ...] = ()
+_active_equipment_snapshot: Tuple[Dict[str, Any], ...] = ()
+
+
+def _publish_snapshot() -> None:
+    # caller holds _store_lock
+    global _equipment_snapshot, _active_equipment_snapshot
+    _equipment_snapshot = tuple(_equipment_store.values())
+    _active_equipment_snapshot = tuple(r for r in _equipment_snapshot if r.get("status") != "replaced")
+
+
+# Fleet scans fan out to a thread pool above this many records; the
+# per-record helpers are lock-free over the snapshot. map() keeps order.
+# Also used for other independent per-item work (e.g. unit plan expansion).
+_PARALLEL_SCAN_MIN = 256
+
+
+def _scan_snapshot(fn, records: Sequence[Dict[str, Any]]) -> List[Any]:
+    if len(records) > _PARALLEL_SCAN_MIN:
+        max_workers = min(32, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fn, records))
+    return [fn(rec) for rec in records]
+
+
+# Per-record fuel and maintenance logs are bounded ring buffers holding the
+# most recent entries. Readers that need whole-life figures (fuel totals,
+# maintenance cost, last service) combine them with the running totals
+# below, which eviction never subtracts from.
+_HISTORY_MAXLEN = 2048
+
+# Lifetime fuel totals per equipment: (history, entries, liters, cost,
+# usage_hours), where history is the deque the totals were last published
+# with. log_fuel_usage publishes a new tuple under the record lock; readers
+# take the tuple once and use only its numbers, so they never pair a deque
+# with totals from a different write. A tuple whose history is not the
+# record's current fuel_history (e.g. records created before totals were
+# tracked) is ignored and the history summed instead.
+_fuel_totals: Dict[str, Tuple[Any, int, float, float, float]] = {}
+
+# Running (estimated_cost sum, latest performed_at) of maintenance_history
+# entries already evicted from the ring buffer, per equipment. Updated under
+# the record lock; read with the retained entries via _maintenance_lifetime.
+_maintenance_evicted: Dict[str, Tuple[float, str]] = {}
+
+
+def _sum_fuel_history(history) -> Tuple[Any, int, float, float, float]:
+    entries = list(history)
+    return (
+        history,
+        len(entries),
+        sum(h["liters"] for h in entries),
+        sum(h["cost"] for h in entries),
+        sum(h["usage_hours"] for h in entries),
+    )
+
+
+def _fuel_totals_for(rec: Dict[str, Any]) -> Tuple[Any, int, float, float, float]:
+    history = rec.get("fuel_history") or []
+    totals = _fuel_totals.get(rec["id"])
+    if totals is None or totals[0] is not history:
+        totals = _sum_fuel_history(history)
+    return totals
+
+
+def _fold_evicted_maintenance(equipment_id: str, entry: Dict[str, Any]) -> None:
+    # caller holds the record lock; entry is dropping out of maintenance_history
+    cost_sum, latest = _maintenance_evicted.get(equipment_id, (0.0, ""))
+    try:
+        cost_sum += float(entry.get("estimated_cost", 0.0))
+    except (TypeError, ValueError):
+        pass
+    performed_at = entry.get("performed_at") or ""
+    if performed_at > latest:
+        latest = performed_at
+    _maintenance_evicted[equipment_id] = (cost_sum, latest)
+
+
+def _maintenance_lifetime(rec: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], float, str]:
+    """
+    (retained maintenance entries, estimated_cost of evicted entries,
+    latest performed_at among evicted entries), read under the record lock
+    so an eviction is never missed or counted twice.
+    """
+    equipment_id = rec["id"]
+    with _record_lock(equipment_id):
+        entries = list(rec.get("maintenance_history") or ())
+        evicted_cost, evicted_latest = _maintenance_evicted.get(equipment_id, (0.0, ""))
+    return entries, evicted_cost, evicted_latest
+
+
+# Active (not replaced) equipment count per lowercased type, kept in step
+# by add/update/delete/mark_replaced so demand forecasts don't rescan the
+# store for inventory.
+_type_counts: Counter = Counter()
+_type_counts_lock = Lock()
+
+
+def _adjust_type_count(type_lower: str, delta: int) -> None:
+    with _type_counts_lock:
+        n = _type_counts[type_lower] + delta
+        if n > 0:
+            _type_counts[type_lower] = n
+        else:
+            del _type_counts[type_lower]
+
+
+# Per-equipment version, bumped (under the record's shard lock) by every
+# writer in this module that changes a record or its worker log. Derived
+# results cached across requests key on it.
+_equipment_version: Dict[str, int] = {}
+
+
+def _bump_version(equipment_id: str) -> None:
+    # caller holds _record_lock(equipment_id)
+    _equipment_version[equipment_id] = _equipment_version.get(equipment_id, 0) + 1
+
+
+# Per-call memo for derived signals (health, schedule, fuel, alerts, risk).
+# Callers that need several signals for the same equipment create a dict
+# and pass it as _cache; keys are (signal, equipment_id). Results are
+# shared, so treat them as read-only.
+def _memo(cache: Optional[Dict[Tuple[str, str], Any]], key: Tuple[str, str], compute):
+    if cache is None:
+        return compute()
+    hit = cache.get(key)
+    if hit is None:
+        hit = cache[key] = compute()
+    return hit
+
 
 def add_equipment(
     name: str,
@@ -34,7 +204,7 @@ def add_equipment(
     No DB used yet — stored only in memory.
     """
 
-    equipment_id = str(uuid.uuid4())
+    equipment_id = f"eq-{next(_id_counter)}"
     record = {
         "id": equipment_id,
         "name": name,
@@ -44,10 +214,16 @@ def add_equipment(
         "year": year,
         "assigned_unit_id": assigned_unit_id,
         "created_at": datetime.utcnow(),
+        # lowercased copies for the type/model matching in the scorers
+        "type_lower": (type or "").lower(),
+        "model_lower": (model or "").lower(),
+        "is_tractor": "tractor" in (type or "").lower(),
     }
 
     with _store_lock:
         _equipment_store[equipment_id] = record
+        _adjust_type_count(record["type_lower"], 1)
+        _publish_snapshot()
 
     return record
 
@@ -56,8 +232,7 @@ def list_equipment() -> Dict[str, Any]:
     """
     Return all equipment records.
     """
-    with _store_lock:
-        items = list(_equipment_store.values())
+    items = list(_equipment_snapshot)
     return {"count": len(items), "items": items}
 
 
@@ -65,8 +240,7 @@ def get_equipment(equipment_id: str) -> Dict[str, Any]:
     """
     Get equipment record by ID.
     """
-    with _store_lock:
-        return _equipment_store.get(equipment_id)
+    return _equipment_store.get(equipment_id)
 def update_equipment(
     equipment_id: str,
     name: str = None,
@@ -80,25 +254,33 @@ def update_equipment(
     Update equipment details (Feature #202)
     Only updates fields provided (partial update).
     """
-    with _store_lock:
+    # build the new field values before taking the record lock
+    fields = (
+        ("name", name),
+        ("type", type),
+        ("manufacturer", manufacturer),
+        ("model", model),
+        ("year", year),
+        ("assigned_unit_id", assigned_unit_id),
+        ("type_lower", type.lower() if type is not None else None),
+        ("is_tractor", "tractor" in type.lower() if type is not None else None),
+        ("model_lower", model.lower() if model is not None else None),
+    )
+    updates = [(k, v) for k, v in fields if v is not None]
+    updated_at = datetime.utcnow()
+
+    with _record_lock(equipment_id):
         rec = _equipment_store.get(equipment_id)
         if not rec:
             return None
 
-        if name is not None:
-            rec["name"] = name
-        if type is not None:
-            rec["type"] = type
-        if manufacturer is not None:
-            rec["manufacturer"] = manufacturer
-        if model is not None:
-            rec["model"] = model
-        if year is not None:
-            rec["year"] = year
-        if assigned_unit_id is not None:
-            rec["assigned_unit_id"] = assigned_unit_id
-
-        rec["updated_at"] = datetime.utcnow()
+        if type is not None and rec.get("status") != "replaced":
+            _adjust_type_count(rec["type_lower"], -1)
+            _adjust_type_count(type.lower(), 1)
+
+        rec.update(updates)
+        rec["updated_at"] = updated_at
+        _bump_version(equipment_id)
 
     return rec
 
@@ -107,13 +289,21 @@ def delete_equipment(equipment_id: str) -> bool:
     Delete equipment from in-memory store (Feature #203).
     Returns True if deleted, False if not found.
     """
-    with _store_lock:
-        if equipment_id in _equipment_store:
-            del _equipment_store[equipment_id]
-            return True
-        return False
+    # record lock too, so an in-flight update/replace can't adjust type
+    # counts for a record that is being removed
+    with _store_lock, _record_lock(equipment_id):
+        rec = _equipment_store.pop(equipment_id, _MISSING)
+        if rec is _MISSING:
+            return False
+        if rec.get("status") != "replaced":
+            _adjust_type_count(rec["type_lower"], -1)
+        _fuel_totals.pop(equipment_id, None)
+        _maintenance_evicted.pop(equipment_id, None)
+        _equipment_version.pop(equipment_id, None)
+        _publish_snapshot()
+        return True
 
-def compute_equipment_health(equipment_id: str) -> Dict[str, Any]:
+def compute_equipment_health(equipment_id: str, _cache: Optional[dict] = None) -> Dict[str, Any]:
     """
     Computes an equipment health score (0–100) based on:
     - age (year)
@@ -123,16 +313,21 @@ def compute_equipment_health(equipment_id: str) -> Dict[str, Any]:
     
     Pure mock logic for now. Will be replaced with real calculations later.
     """
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    return _memo(_cache, ("health", equipment_id), lambda: _health_from_rec(rec))
 
-        if not rec:
-            return None
+
+def _health_from_rec(rec: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
 
     # ----- AGE FACTOR -----
     year = rec.get("year")
     if year:
-        age = max(0, datetime.utcnow().year - year)
+        age = max(0, now.year - year)
     else:
         age = 5  # assume mid-age if unknown
 
@@ -147,7 +342,7 @@ def compute_equipment_health(equipment_id: str) -> Dict[str, Any]:
     wear_penalty = min(20, wear_factor * 5)
 
     # ----- MODEL RELIABILITY (mock) -----
-    model = rec.get("model", "").lower()
+    model = rec.get("model_lower", "")
     reliability_bonus = 5 if "premium" in model else 0
 
     # ----- FINAL HEALTH SCORE -----
@@ -166,26 +361,51 @@ def compute_equipment_health(equipment_id: str) -> Dict[str, Any]:
             "usage_penalty": usage_penalty,
             "wear_penalty": wear_penalty,
         },
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
-def generate_maintenance_schedule(equipment_id: str) -> Dict[str, Any]:
+def generate_maintenance_schedule(
+    equipment_id: str,
+    _cache: Optional[dict] = None,
+    fields: Optional[frozenset] = None,
+) -> Dict[str, Any]:
     """
     Predictive maintenance schedule engine.
     Uses age, usage, wear factor to calculate:
     - next maintenance due date
     - recommended tasks
     - priority level
+    Pass `fields` to get a slim dict with only those top-level keys.
     """
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    if fields is None:
+        return _memo(_cache, ("schedule", equipment_id), lambda: _schedule_from_rec(rec))
+    return _slim_schedule(rec, fields, _cache)
+
+
+# Schedule keys the risk/alert and reminder paths actually read
+_SCHEDULE_RISK_FIELDS = frozenset({"days_left"})
+_SCHEDULE_REMINDER_FIELDS = frozenset({"days_left", "priority", "recommended_tasks", "next_maintenance_date"})
+
+
+def _slim_schedule(rec: Dict[str, Any], fields: frozenset, _cache: Optional[dict] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    # reuse a full schedule already computed for this request, if any
+    full = _cache.get(("schedule", rec["id"])) if _cache is not None else None
+    if full is not None:
+        return {k: full[k] for k in fields if k in full}
+    return _schedule_from_rec(rec, now, fields)
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+
+def _schedule_from_rec(rec: Dict[str, Any], now: Optional[datetime] = None, fields: Optional[frozenset] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
 
     # Extract metadata
-    year = rec.get("year", datetime.utcnow().year - 5)
-    age = datetime.utcnow().year - year
+    year = rec.get("year", now.year - 5)
+    age = now.year - year
 
     usage_hours = rec.get("usage_hours", 200)
     wear_factor = rec.get("wear_factor", 1)
@@ -199,12 +419,10 @@ def generate_maintenance_schedule(equipment_id: str) -> Dict[str, Any]:
     interval = max(30, base_interval_days - usage_penalty_days - wear_penalty_days)
 
     # Mock last maintenance date
-    last_maintenance = rec.get("last_maintenance_at", datetime.utcnow())
-    if isinstance(last_maintenance, str):
-        last_maintenance = datetime.fromisoformat(last_maintenance)
+    last_maintenance = rec.get("last_maintenance_at", now)
 
     next_due = last_maintenance + timedelta(days=interval)
-    days_left = (next_due - datetime.utcnow()).days
+    days_left = (next_due - now).days
 
     # ----- PRIORITY RULES -----
     if days_left < 0:
@@ -217,16 +435,30 @@ def generate_maintenance_schedule(equipment_id: str) -> Dict[str, Any]:
         priority = "low"
 
     # ----- RECOMMENDED TASKS -----
-    tasks = ["General inspection", "Lubrication", "Clean filters"]
+    tasks = None
+    if fields is None or "recommended_tasks" in fields:
+        tasks = ["General inspection", "Lubrication", "Clean filters"]
 
-    if "tractor" in rec["type"].lower():
-        tasks += ["Engine oil change", "Hydraulic check"]
+        if rec.get("is_tractor"):
+            tasks += ["Engine oil change", "Hydraulic check"]
 
-    if wear_factor > 1:
-        tasks.append("Replace worn parts")
+        if wear_factor > 1:
+            tasks.append("Replace worn parts")
 
-    if usage_hours > 300:
-        tasks.append("Full service recommended (high usage)")
+        if usage_hours > 300:
+            tasks.append("Full service recommended (high usage)")
+
+    if fields is not None:
+        # slim result: skip the details block and unrequested keys
+        slim = {
+            "equipment_id": equipment_id,
+            "next_maintenance_date": next_due,
+            "days_left": days_left,
+            "priority": priority,
+            "recommended_tasks": tasks,
+            "calculated_at": now,
+        }
+        return {k: slim[k] for k in fields if k in slim}
 
     return {
         "equipment_id": equipment_id,
@@ -234,7 +466,7 @@ def generate_maintenance_schedule(equipment_id: str) -> Dict[str, Any]:
         "days_left": days_left,
         "priority": priority,
         "recommended_tasks": tasks,
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
         "details": {
             "age_years": age,
             "usage_hours": usage_hours,
@@ -251,20 +483,23 @@ def get_maintenance_reminders(equipment_id: str, days_ahead: int = 30) -> Dict[s
     - if due within `days_ahead`
     - otherwise 'ok'
     """
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    return _reminder_from_rec(rec, days_ahead)
 
-    schedule = generate_maintenance_schedule(equipment_id)
+
+def _reminder_from_rec(rec: Dict[str, Any], days_ahead: int = 30, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
+
+    schedule = _schedule_from_rec(rec, now, _SCHEDULE_REMINDER_FIELDS)
     if not schedule:
         return None
 
     next_due = schedule.get("next_maintenance_date")
-    if isinstance(next_due, str):
-        next_due = datetime.fromisoformat(next_due)
-
-    days_left = schedule.get("days_left", (next_due - datetime.utcnow()).days)
+    days_left = schedule.get("days_left", (next_due - now).days)
 
     if days_left < 0:
         status = "overdue"
@@ -284,31 +519,40 @@ def get_maintenance_reminders(equipment_id: str, days_ahead: int = 30) -> Dict[s
         "next_maintenance_date": next_due,
         "recommended_tasks": schedule.get("recommended_tasks", []),
         "priority": schedule.get("priority"),
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
 
-def get_all_maintenance_reminders(days_ahead: int = 30) -> Dict[str, Any]:
+# Reminder ordering: overdue first, then high priority, then due_soon
+_REMINDER_STATUS_ORDER = {"overdue": 0, "due_soon": 1, "ok": 2}
+_REMINDER_PRIORITY_ORDER = {"overdue": 0, "high": 0, "medium": 1, "low": 2}
+
+
+def _reminder_sort_key(r: Dict[str, Any]) -> Tuple[int, int, int]:
+    return (
+        _REMINDER_STATUS_ORDER.get(r["status"], 3),
+        _REMINDER_PRIORITY_ORDER.get(r.get("priority", "low"), 2),
+        r["days_left"],
+    )
+
+
+def get_all_maintenance_reminders(days_ahead: int = 30, limit: Optional[int] = None) -> Dict[str, Any]:
     """
     Returns reminders for all equipment in the in-memory store.
     Useful for admin dashboards to list upcoming/overdue maintenances.
+    If limit is set, only the `limit` most urgent reminders are returned.
     """
     reminders: List[Dict[str, Any]] = []
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
-
-    for eid in equipment_ids:
-        rem = get_maintenance_reminders(eid, days_ahead=days_ahead)
+    now = datetime.utcnow()
+    for rec in _equipment_snapshot:
+        rem = _reminder_from_rec(rec, days_ahead=days_ahead, now=now)
         if rem:
             reminders.append(rem)
 
-    # Optionally sort: overdue first, then high priority, then due_soon
-    def sort_key(r):
-        status_order = {"overdue": 0, "due_soon": 1, "ok": 2}
-        prio_map = {"overdue": 0, "high": 0, "medium": 1, "low": 2}
-        return (status_order.get(r["status"], 3), prio_map.get(r.get("priority", "low"), 2), r["days_left"])
-
-    reminders.sort(key=sort_key)
+    if limit is None:
+        reminders.sort(key=_reminder_sort_key)
+    else:
+        reminders = heapq.nsmallest(limit, reminders, key=_reminder_sort_key)
     return {"count": len(reminders), "reminders": reminders}
 
 def mark_equipment_maintenance_done(
@@ -328,14 +572,15 @@ def mark_equipment_maintenance_done(
 
     if performed_at is None:
         performed_at = datetime.utcnow()
+    performed_iso = performed_at.isoformat()
 
-    with _store_lock:
+    with _record_lock(equipment_id):
         rec = _equipment_store.get(equipment_id)
         if not rec:
             return None
 
         # Update last maintenance date
-        rec["last_maintenance_at"] = performed_at.isoformat()
+        rec["last_maintenance_at"] = performed_at
 
         # Reset or reduce wear factor (mock logic)
         wear = rec.get("wear_factor", 1)
@@ -347,16 +592,23 @@ def mark_equipment_maintenance_done(
 
         # Add maintenance history log
         history_entry = {
-            "performed_at": performed_at.isoformat(),
+            "performed_at": performed_iso,
             "notes": notes,
             "usage_hours_before": usage,
             "wear_factor_before": wear,
         }
 
-        if "maintenance_history" not in rec:
-            rec["maintenance_history"] = []
+        history = rec.get("maintenance_history")
+        if not isinstance(history, deque):
+            old = list(history or ())
+            for dropped in old[:max(0, len(old) - _HISTORY_MAXLEN)]:
+                _fold_evicted_maintenance(equipment_id, dropped)
+            history = rec["maintenance_history"] = deque(old, maxlen=_HISTORY_MAXLEN)
+        if len(history) == history.maxlen:
+            _fold_evicted_maintenance(equipment_id, history[0])
 
-        rec["maintenance_history"].append(history_entry)
+        history.append(history_entry)
+        _bump_version(equipment_id)
 
     # Return updated record + new schedule
     new_schedule = generate_maintenance_schedule(equipment_id)
@@ -366,7 +618,7 @@ def mark_equipment_maintenance_done(
         "maintenance_recorded_at": performed_at,
     }
 
-def get_major_service_alerts(equipment_id: str) -> Dict[str, Any]:
+def get_major_service_alerts(equipment_id: str, _cache: Optional[dict] = None) -> Dict[str, Any]:
     """
     Major Service Due Alert Engine (Feature #209)
 
@@ -380,14 +632,24 @@ def get_major_service_alerts(equipment_id: str) -> Dict[str, Any]:
 
     Returns high-level alerts and breakdown risk.
     """
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    now = datetime.utcnow()
+    return _memo(_cache, ("alerts", equipment_id), lambda: _major_alerts_from_rec(
+        rec,
+        _memo(_cache, ("health", equipment_id), lambda: _health_from_rec(rec, now)),
+        _slim_schedule(rec, _SCHEDULE_RISK_FIELDS, _cache, now),
+        now,
+    ))
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+
+def _major_alerts_from_rec(rec: Dict[str, Any], health: Dict[str, Any], schedule: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
 
     # Get health score
-    health = compute_equipment_health(equipment_id)
     health_score = health["health_score"]
 
     # Usage and wear
@@ -395,12 +657,11 @@ def get_major_service_alerts(equipment_id: str) -> Dict[str, Any]:
     wear_factor = rec.get("wear_factor", 1)
 
     # Maintenance schedule
-    schedule = generate_maintenance_schedule(equipment_id)
     days_left = schedule.get("days_left", 0)
 
     # Determine if equipment is old enough for major service
-    year = rec.get("year", datetime.utcnow().year - 5)
-    age = datetime.utcnow().year - year
+    year = rec.get("year", now.year - 5)
+    age = now.year - year
     major_service_cycle_years = 3   # mock rule
 
     alerts = []
@@ -464,7 +725,7 @@ def get_major_service_alerts(equipment_id: str) -> Dict[str, Any]:
         "usage_hours": usage_hours,
         "wear_factor": wear_factor,
         "days_until_next_service": days_left,
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
 def log_fuel_usage(
@@ -484,26 +745,38 @@ def log_fuel_usage(
     if filled_at is None:
         filled_at = datetime.utcnow()
 
-    with _store_lock:
+    with _record_lock(equipment_id):
         rec = _equipment_store.get(equipment_id)
         if not rec:
             return None
 
-        if "fuel_history" not in rec:
-            rec["fuel_history"] = []
+        # lifetime totals are taken before a list is converted (and possibly
+        # truncated) into the ring buffer
+        totals = _fuel_totals_for(rec)
+        history = rec.get("fuel_history")
+        if not isinstance(history, deque):
+            history = rec["fuel_history"] = deque(history or (), maxlen=_HISTORY_MAXLEN)
 
         entry = {
             "liters": liters,
             "cost": cost,
             "usage_hours": usage_hours,
-            "filled_at": filled_at.isoformat()
+            "filled_at": filled_at
         }
 
-        rec["fuel_history"].append(entry)
+        history.append(entry)
+        _fuel_totals[equipment_id] = (
+            history,
+            totals[1] + 1,
+            totals[2] + liters,
+            totals[3] + cost,
+            totals[4] + usage_hours,
+        )
 
         # Update usage hours on equipment
         prev_usage = rec.get("usage_hours", 0)
         rec["usage_hours"] = prev_usage + usage_hours
+        _bump_version(equipment_id)
 
     return entry
 
@@ -512,19 +785,19 @@ def get_fuel_usage_history(equipment_id: str) -> Dict[str, Any]:
     """
     Returns all logged fuel usage for the equipment.
     """
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
-        return {
-            "equipment_id": equipment_id,
-            "count": len(rec.get("fuel_history", [])),
-            "history": rec.get("fuel_history", [])
-        }
+    history = list(rec.get("fuel_history", ()))
+    return {
+        "equipment_id": equipment_id,
+        "count": len(history),
+        "history": history
+    }
 
 
-def compute_fuel_efficiency(equipment_id: str) -> Dict[str, Any]:
+def compute_fuel_efficiency(equipment_id: str, _cache: Optional[dict] = None) -> Dict[str, Any]:
     """
     Computes fuel efficiency metrics:
     - liters per hour
@@ -532,23 +805,26 @@ def compute_fuel_efficiency(equipment_id: str) -> Dict[str, Any]:
     - average cost per hour
     - abnormal usage alerts (mock)
     """
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    return _memo(_cache, ("fuel", equipment_id), lambda: _fuel_eff_from_rec(rec))
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
 
-        history = rec.get("fuel_history", [])
-        if not history:
-            return {
-                "equipment_id": equipment_id,
-                "efficiency_score": None,
-                "message": "No fuel logs available",
-            }
+def _fuel_eff_from_rec(rec: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
+
+    history = rec.get("fuel_history", [])
+    if not history:
+        return {
+            "equipment_id": equipment_id,
+            "efficiency_score": None,
+            "message": "No fuel logs available",
+        }
 
-    total_liters = sum(h["liters"] for h in history)
-    total_cost = sum(h["cost"] for h in history)
-    total_hours = sum(h["usage_hours"] for h in history)
+    _, _, total_liters, total_cost, total_hours = _fuel_totals_for(rec)
 
     if total_hours == 0:
         return {
@@ -580,10 +856,10 @@ def compute_fuel_efficiency(equipment_id: str) -> Dict[str, Any]:
             "efficiency_score": efficiency_score,
             "alerts": alerts,
         },
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
-def compute_breakdown_probability(equipment_id: str) -> Dict[str, Any]:
+def compute_breakdown_probability(equipment_id: str, _cache: Optional[dict] = None) -> Dict[str, Any]:
     """
     Compute a breakdown probability (0-100) based on multiple signals:
     - low health -> higher risk
@@ -595,46 +871,95 @@ def compute_breakdown_probability(equipment_id: str) -> Dict[str, Any]:
     Returns a dict with score, component breakdown and recommendations.
     """
 
-    # local imports to avoid circular import at module load
-    from app.services.farmer.spare_parts_service import get_parts_for_equipment
-    # compute existing signals
-    rec = None
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    return _memo(_cache, ("breakdown", equipment_id), lambda: _breakdown_from_rec(rec, _cache=_cache))
+
+
+def _breakdown_from_rec(rec: Dict[str, Any], now: Optional[datetime] = None, _cache: Optional[dict] = None) -> Dict[str, Any]:
+    if now is None:
+        now = datetime.utcnow()
+    signals = _breakdown_signals(rec, now, _cache)
+    return _breakdown_result(rec["id"], signals, _breakdown_risks(signals), now)
+
+
+# spare_parts_service stays a deferred import (keeps module load order
+# free of cycles); resolve it on first use and keep the reference so the
+# batch scans don't repeat the import per record. Memoized per call via
+# _cache like the other signals.
+_get_parts_for_equipment = None
+
+
+def _parts_for_equipment(equipment_id: str, _cache: Optional[dict] = None):
+    global _get_parts_for_equipment
+    if _get_parts_for_equipment is None:
+        from app.services.farmer.spare_parts_service import get_parts_for_equipment
+        _get_parts_for_equipment = get_parts_for_equipment
+    return _memo(_cache, ("parts", equipment_id), lambda: _get_parts_for_equipment(equipment_id))
 
-    health_obj = compute_equipment_health(equipment_id) or {}
+
+# (get_farm_wide_parts_cost, get_parts_version), resolved the same way
+_parts_cost_fns = None
+
+
+def _parts_cost_lookups():
+    global _parts_cost_fns
+    if _parts_cost_fns is None:
+        from app.services.farmer.spare_parts_service import get_farm_wide_parts_cost, get_parts_version
+        _parts_cost_fns = (get_farm_wide_parts_cost, get_parts_version)
+    return _parts_cost_fns
+
+
+def _breakdown_signals(rec: Dict[str, Any], now: datetime, _cache: Optional[dict] = None) -> Tuple:
+    """
+    Gathers the raw risk inputs for one equipment:
+    (health_score, usage_hours, wear_factor, days_left, liters_per_hour,
+     missing_parts, low_stock_parts, major_alerts)
+    """
+    equipment_id = rec["id"]
+    # compute existing signals once; major alerts reuse health and schedule
+    health_obj = _memo(_cache, ("health", equipment_id), lambda: _health_from_rec(rec, now))
     health_score = health_obj.get("health_score", 80)
 
     usage_hours = rec.get("usage_hours", 0)
     wear_factor = rec.get("wear_factor", 1)
 
     # maintenance schedule
-    schedule = generate_maintenance_schedule(equipment_id) or {}
+    schedule = _slim_schedule(rec, _SCHEDULE_RISK_FIELDS, _cache, now)
     days_left = schedule.get("days_left", 999)
 
     # fuel efficiency (may return message if no data)
-    fuel_eff = compute_fuel_efficiency(equipment_id) or {}
+    fuel_eff = _memo(_cache, ("fuel", equipment_id), lambda: _fuel_eff_from_rec(rec, now))
     liters_per_hour = None
     if "fuel_efficiency" in fuel_eff and fuel_eff["fuel_efficiency"].get("liters_per_hour") is not None:
         liters_per_hour = fuel_eff["fuel_efficiency"]["liters_per_hour"]
 
     # parts assigned / availability
-    parts_info = get_parts_for_equipment(equipment_id) or {}
-    missing_parts = 0
-    low_stock_parts = 0
-    for item in parts_info.get("items", []):
-        part = item.get("part")
-        if not part:
-            missing_parts += 1
-        else:
-            if part.get("quantity", 0) <= part.get("min_stock_threshold", 1):
-                low_stock_parts += 1
+    parts_info = _parts_for_equipment(equipment_id, _cache) or {}
+    items = parts_info.get("items", ())
+    missing_parts = sum(1 for item in items if not item.get("part"))
+    low_stock_parts = sum(
+        1 for item in items
+        if (part := item.get("part")) and part.get("quantity", 0) <= part.get("min_stock_threshold", 1)
+    )
 
     # Major service alerts influence
-    major_alerts = get_major_service_alerts(equipment_id) or {}
-    major_alert_count = len(major_alerts.get("major_service_alerts", []))
+    major_alerts = _memo(_cache, ("alerts", equipment_id), lambda: _major_alerts_from_rec(rec, health_obj, schedule, now))
+
+    return (
+        health_score, usage_hours, wear_factor, days_left, liters_per_hour,
+        missing_parts, low_stock_parts, major_alerts.get("major_service_alerts", []),
+    )
+
+
+def _breakdown_risks(signals: Tuple) -> Tuple[int, int, int, int, int, int, int, int]:
+    """
+    Pure scoring kernel: maps raw signals to component risks and the
+    unified probability. Returns
+    (health, usage, wear, maintenance, fuel, parts, major, unified).
+    """
+    health_score, usage_hours, wear_factor, days_left, liters_per_hour, missing_parts, low_stock_parts, alerts = signals
 
     # Compose risk factors (normalized to 0-100)
     # health contribution (lower health -> higher risk)
@@ -670,20 +995,27 @@ def compute_breakdown_probability(equipment_id: str) -> Dict[str, Any]:
     parts_risk += min(15, low_stock_parts * 5)
 
     # major-alerts add risk
-    major_risk = min(20, major_alert_count * 8)
+    major_risk = min(20, len(alerts) * 8)
 
-    # Weighted sum (tunable)
+    # Weighted sum (tunable), in integer percent to avoid float rounding:
+    # health 30%, usage/wear/maintenance 15%, fuel/parts 10%, major 5%
     total = (
-        health_risk * 0.30 +
-        usage_risk * 0.15 +
-        wear_risk * 0.15 +
-        maintenance_risk * 0.15 +
-        fuel_risk * 0.10 +
-        parts_risk * 0.10 +
-        major_risk * 0.05
+        health_risk * 30 +
+        usage_risk * 15 +
+        wear_risk * 15 +
+        maintenance_risk * 15 +
+        fuel_risk * 10 +
+        parts_risk * 10 +
+        major_risk * 5
     )
 
-    unified = int(min(100, total))
+    unified = min(100, total // 100)
+    return health_risk, usage_risk, wear_risk, maintenance_risk, fuel_risk, parts_risk, major_risk, unified
+
+
+def _breakdown_result(equipment_id: str, signals: Tuple, risks: Tuple, now: datetime) -> Dict[str, Any]:
+    health_score, usage_hours, wear_factor, days_left, liters_per_hour, missing_parts, low_stock_parts, alerts = signals
+    health_risk, usage_risk, wear_risk, maintenance_risk, fuel_risk, parts_risk, major_risk, unified = risks
 
     # Recommendations
     recommendations = []
@@ -725,48 +1057,53 @@ def compute_breakdown_probability(equipment_id: str) -> Dict[str, Any]:
             "liters_per_hour": liters_per_hour,
             "missing_parts": missing_parts,
             "low_stock_parts": low_stock_parts,
-            "major_service_alerts": major_alerts.get("major_service_alerts", []),
+            "major_service_alerts": alerts,
         },
         "recommendations": recommendations,
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
-def list_high_risk_equipment(threshold: int = 60) -> Dict[str, Any]:
+def list_high_risk_equipment(threshold: int = 60, limit: Optional[int] = None) -> Dict[str, Any]:
     """
     Returns a list of equipment whose breakdown risk >= threshold.
     Default threshold: 60 (high-risk).
+    If limit is set, only the `limit` riskiest are returned.
     """
 
-    results = []
+    # score every record with the kernel; only build the full result
+    # (recommendations, detail dicts) for records over the threshold
+    now = datetime.utcnow()
 
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
+    def _score(rec):
+        signals = _breakdown_signals(rec, now)
+        risks = _breakdown_risks(signals)
+        if risks[-1] < threshold:
+            return None
 
-    for eid in equipment_ids:
-        risk_info = compute_breakdown_probability(eid)
-        if not risk_info:
-            continue
-        score = risk_info.get("breakdown_probability", 0)
-
-        if score >= threshold:
-            results.append({
-                "equipment_id": eid,
-                "breakdown_probability": score,
-                "recommendations": risk_info.get("recommendations", []),
-                "details": risk_info.get("details", {}),
-            })
+        risk_info = _breakdown_result(rec["id"], signals, risks, now)
+        return {
+            "equipment_id": rec["id"],
+            "breakdown_probability": risk_info["breakdown_probability"],
+            "recommendations": risk_info["recommendations"],
+            "details": risk_info["details"],
+        }
+
+    results = [r for r in _scan_snapshot(_score, _equipment_snapshot) if r is not None]
 
     # Sort highest risk first
-    results.sort(key=lambda x: x["breakdown_probability"], reverse=True)
+    if limit is None:
+        results.sort(key=lambda x: x["breakdown_probability"], reverse=True)
+    else:
+        results = heapq.nlargest(limit, results, key=lambda x: x["breakdown_probability"])
 
     return {
         "threshold": threshold,
         "count": len(results),
         "high_risk_equipment": results,
-        "timestamp": datetime.utcnow(),
+        "timestamp": now,
     }
 
-def compute_equipment_utilization(equipment_id: str) -> Optional[Dict[str, Any]]:
+def compute_equipment_utilization(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Computes utilization analytics for the equipment.
     Uses:
@@ -775,20 +1112,23 @@ def compute_equipment_utilization(equipment_id: str) -> Optional[Dict[str, Any]]
     - underutilized / overused status
     - utilization score (0–100)
     """
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+    return _memo(_cache, ("util", equipment_id), lambda: _utilization_from_rec(rec))
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+
+def _utilization_from_rec(rec: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    if now is None:
+        now = datetime.utcnow()
 
     usage_hours = rec.get("usage_hours", 0)
 
     # Estimate usage duration period (mock)
     created_at = rec.get("created_at")
-    if isinstance(created_at, str):
-        created_at = datetime.fromisoformat(created_at)
 
-    days_active = max(1, (datetime.utcnow() - created_at).days)
+    days_active = max(1, (now - created_at).days)
 
     avg_daily_usage = usage_hours / days_active
 
@@ -837,36 +1177,50 @@ def compute_equipment_utilization(equipment_id: str) -> Optional[Dict[str, Any]]
         "usage_status": idle_status,
         "alerts": alerts,
         "usage_heatmap": heatmap,
-        "calculated_at": datetime.utcnow(),
+        "calculated_at": now,
     }
 
 
-def compute_all_equipment_utilization() -> Dict[str, Any]:
+def compute_all_equipment_utilization(limit: Optional[int] = None) -> Dict[str, Any]:
     """
     Returns utilization summary for all equipment.
     Useful for dashboards.
+    If limit is set, only the `limit` most utilized are returned.
     """
 
-    summary = []
-
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
-
-    for eid in equipment_ids:
-        util = compute_equipment_utilization(eid)
-        if util:
-            summary.append(util)
+    now = datetime.utcnow()
+    summary = _scan_snapshot(lambda rec: _utilization_from_rec(rec, now), _equipment_snapshot)
 
     # Sort by utilization score descending
-    summary.sort(key=lambda x: x["utilization_score"], reverse=True)
+    if limit is None:
+        summary.sort(key=lambda x: x["utilization_score"], reverse=True)
+    else:
+        summary = heapq.nlargest(limit, summary, key=lambda x: x["utilization_score"])
 
     return {
         "count": len(summary),
         "utilization_summary": summary,
-        "timestamp": datetime.utcnow(),
+        "timestamp": now,
     }
 
-def compute_idle_status(equipment_id: str) -> Optional[Dict[str, Any]]:
+def _last_activity_from_rec(rec: Dict[str, Any]) -> datetime:
+    # Check maintenance
+    last_activity = rec.get("last_maintenance_at")
+
+    # Check fuel history
+    fuel_history = rec.get("fuel_history", [])
+    if fuel_history:
+        last_fuel_time = fuel_history[-1]["filled_at"]
+        if not last_activity or last_fuel_time > last_activity:
+            last_activity = last_fuel_time
+
+    # If absolutely nothing, assume created_at
+    if not last_activity:
+        last_activity = rec.get("created_at")
+    return last_activity
+
+
+def compute_idle_status(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Computes idle status of equipment based on:
     - last maintenance date
@@ -875,42 +1229,20 @@ def compute_idle_status(equipment_id: str) -> Optional[Dict[str, Any]]:
     - avg daily usage from utilization function
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
-
-    util = compute_equipment_utilization(equipment_id)
-    if not util:
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
         return None
+    return _memo(_cache, ("idle", equipment_id), lambda: _idle_from_rec(rec, _cache))
 
-    avg_daily_usage = util["avg_daily_usage"]
-    days_active = util["days_active"]
 
-    # Determine last known activity
-    last_activity = None
+def _idle_from_rec(rec: Dict[str, Any], _cache: Optional[dict] = None) -> Dict[str, Any]:
+    equipment_id = rec["id"]
+    util = _memo(_cache, ("util", equipment_id), lambda: _utilization_from_rec(rec))
 
-    # Check maintenance
-    if "last_maintenance_at" in rec:
-        try:
-            last_activity = datetime.fromisoformat(rec["last_maintenance_at"])
-        except:
-            pass
-
-    # Check fuel history
-    fuel_history = rec.get("fuel_history", [])
-    if fuel_history:
-        last_fuel_time = datetime.fromisoformat(fuel_history[-1]["filled_at"])
-        if not last_activity or last_fuel_time > last_activity:
-            last_activity = last_fuel_time
-
-    # If absolutely nothing, assume created_at
-    if not last_activity:
-        created_at = rec.get("created_at")
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        last_activity = created_at
+    avg_daily_usage = util["avg_daily_usage"]
+    days_active = util["days_active"]
 
+    last_activity = _last_activity_from_rec(rec)
     idle_days = (datetime.utcnow() - last_activity).days
 
     # Determine idle score
@@ -961,8 +1293,7 @@ def list_idle_equipment(min_idle_days: int = 7) -> Dict[str, Any]:
 
     result = []
 
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
+    equipment_ids = list(_equipment_store.keys())
 
     for eid in equipment_ids:
         idle_info = compute_idle_status(eid)
@@ -982,8 +1313,14 @@ def list_idle_equipment(min_idle_days: int = 7) -> Dict[str, Any]:
         "timestamp": datetime.utcnow(),
     }
 
+# Worker operation logs per equipment. Guarded by the same per-equipment
+# shard lock as the record (_record_lock), so operations on unrelated
+# equipment never contend.
 _worker_operations: Dict[str, List[Dict[str, Any]]] = {}
-_worker_lock = Lock()
+
+# Open operations per (worker_id, equipment_id), oldest first, so completion
+# doesn't scan the whole log. Same shard lock as _worker_operations.
+_active_ops: Dict[Tuple[str, str], deque] = {}
 
 
 def assign_worker_to_equipment(
@@ -996,10 +1333,9 @@ def assign_worker_to_equipment(
     Assigns a worker to equipment and logs operation start.
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
 
     if start_time is None:
         start_time = datetime.utcnow()
@@ -1008,16 +1344,17 @@ def assign_worker_to_equipment(
         "worker_id": worker_id,
         "equipment_id": equipment_id,
         "start_time": start_time.isoformat(),
+        "start_time_ts": start_time.timestamp(),  # epoch seconds, saves a re-parse on completion
         "end_time": None,
         "duration_hours": None,
         "notes": notes,
         "completed": False,
     }
 
-    with _worker_lock:
-        if equipment_id not in _worker_operations:
-            _worker_operations[equipment_id] = []
-        _worker_operations[equipment_id].append(entry)
+    with _record_lock(equipment_id):
+        _worker_operations.setdefault(equipment_id, []).append(entry)
+        _active_ops.setdefault((worker_id, equipment_id), deque()).append(entry)
+        _bump_version(equipment_id)
 
     return entry
 
@@ -1032,35 +1369,36 @@ def complete_worker_operation(
     Also updates equipment usage hours.
     """
 
-    with _worker_lock:
-        ops = _worker_operations.get(equipment_id, [])
-        # find ongoing operation
-        active = None
-        for op in ops:
-            if op["worker_id"] == worker_id and not op["completed"]:
-                active = op
-                break
-
-        if not active:
-            return None
-
     if end_time is None:
         end_time = datetime.utcnow()
+    end_ts = end_time.timestamp()
+    end_iso = end_time.isoformat()
+
+    # one shard lock covers finding/closing the operation and the usage
+    # update, so two completions can't close the same operation
+    with _record_lock(equipment_id):
+        # oldest ongoing operation for this worker
+        key = (worker_id, equipment_id)
+        open_ops = _active_ops.get(key)
+        if not open_ops:
+            return None
+        active = open_ops.popleft()
+        if not open_ops:
+            del _active_ops[key]
 
-    start = datetime.fromisoformat(active["start_time"])
-    duration = (end_time - start).total_seconds() / 3600
-    duration = round(duration, 2)
+        duration = (end_ts - active["start_time_ts"]) / 3600
+        duration = round(duration, 2)
 
-    active["end_time"] = end_time.isoformat()
-    active["duration_hours"] = duration
-    active["completed"] = True
+        active["end_time"] = end_iso
+        active["duration_hours"] = duration
+        active["completed"] = True
 
-    # Update equipment usage hours
-    with _store_lock:
+        # Update equipment usage hours
         eq = _equipment_store.get(equipment_id)
         if eq:
             prev = eq.get("usage_hours", 0)
             eq["usage_hours"] = prev + duration
+        _bump_version(equipment_id)
 
     return active
 
@@ -1069,7 +1407,7 @@ def get_worker_assignments(equipment_id: str) -> Dict[str, Any]:
     """
     Returns all worker operations for a specific equipment.
     """
-    with _worker_lock:
+    with _record_lock(equipment_id):
         ops = _worker_operations.get(equipment_id, [])
         return {
             "equipment_id": equipment_id,
@@ -1084,16 +1422,47 @@ def list_all_worker_operations() -> Dict[str, Any]:
     """
     all_ops = []
 
-    with _worker_lock:
-        for eq_ops in _worker_operations.values():
-            all_ops.extend(eq_ops)
+    # no global lock: list() snapshots of the dict and of each log are
+    # atomic under the GIL; appends made meanwhile are simply not included
+    for eq_ops in list(_worker_operations.values()):
+        all_ops.extend(list(eq_ops))
 
     return {
         "count": len(all_ops),
         "operations": all_ops
     }
 
-def compute_equipment_operating_cost(equipment_id: str) -> Optional[Dict[str, Any]]:
+# -------------------------------------------------------------
+# Cost / depreciation result cache
+# -------------------------------------------------------------
+# Small FIFO cache (insertion-ordered dict) of operating-cost and
+# depreciation results. Keys carry the equipment version, and for cost
+# the spare-parts version, so any write makes old entries unreachable;
+# they age out in FIFO order. Hits return a deep copy with a fresh
+# calculated_at.
+_COST_CACHE_MAX = 256
+_cost_cache: Dict[Tuple, Dict[str, Any]] = {}
+_cost_cache_lock = Lock()
+
+
+def _cost_cache_get(key: Tuple) -> Optional[Dict[str, Any]]:
+    hit = _cost_cache.get(key)
+    if hit is None:
+        return None
+    result = copy.deepcopy(hit)
+    result["calculated_at"] = datetime.utcnow()
+    return result
+
+
+def _cost_cache_put(key: Tuple, result: Dict[str, Any]) -> None:
+    stored = copy.deepcopy(result)
+    with _cost_cache_lock:
+        if key not in _cost_cache and len(_cost_cache) >= _COST_CACHE_MAX:
+            _cost_cache.pop(next(iter(_cost_cache)))
+        _cost_cache[key] = stored
+
+
+def compute_equipment_operating_cost(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Computes operating cost breakdown for equipment (mock).
     - fuel: sum of fuel_history costs
@@ -1116,47 +1485,53 @@ def compute_equipment_operating_cost(equipment_id: str) -> Optional[Dict[str, An
     Notes:
     - This is a heuristic estimator (no DB). Fields not present default sensibly.
     """
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    if _cache is not None:
+        return _memo(_cache, ("cost", equipment_id), lambda: compute_equipment_operating_cost(equipment_id))
+
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+
+    # try to sum consumption_history amounts * unit_price
+    try:
+        get_farm_wide_parts_cost, get_parts_version = _parts_cost_lookups()
+        parts_version = get_parts_version()
+    except Exception:
+        get_farm_wide_parts_cost = None
+        parts_version = None
+
+    # key is taken before reading so a concurrent write can't get a stale
+    # result cached under its new version
+    cache_key = ("cost", equipment_id, _equipment_version.get(equipment_id, 0), parts_version)
+    cached = _cost_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     # ----- Fuel cost -----
+    # running totals when they describe the current history, else one fsum pass
     fuel_hist = rec.get("fuel_history", [])
-    total_fuel_cost = sum((entry.get("cost") or 0.0) for entry in fuel_hist)
+    fuel_totals = _fuel_totals.get(equipment_id)
+    if fuel_totals is not None and fuel_totals[0] is fuel_hist:
+        total_fuel_cost = fuel_totals[3]
+    else:
+        total_fuel_cost = math.fsum((entry.get("cost") or 0.0) for entry in list(fuel_hist))
 
     # ----- Parts cost -----
     parts_cost = 0.0
-    part_assigns = {}
-    # try to sum consumption_history amounts * unit_price
-    try:
-        from app.services.farmer.spare_parts_service import list_parts, get_part
-    except Exception:
-        get_part = None
-
-    # If spare parts store exists, iterate consumption_history on parts
-    # fallback: if equipment has maintenance_history with 'parts_cost' use that
-    if get_part:
-        # iterate all parts and sum consumption entries that reference this equipment (best-effort)
-        parts_info = []
-        # list_parts returns items; avoid calling list_parts() heavy - instead try to inspect assignment store
-        # Simplified approach: if part records exist, sum their consumption_history (not linked to equipment)
+
+    # consumption_history entries are not reliably linked to equipment, so
+    # this is the farm-wide consumed parts cost (cached by the parts service
+    # per parts version)
+    if get_farm_wide_parts_cost:
         try:
-            all_parts = list_parts().get("items", [])
-            for p in all_parts:
-                for ch in p.get("consumption_history", []):
-                    # consumption_history entries do not include equipment_id in our model,
-                    # so we aggregate all parts consumption as farm-wide part cost and allocate proportionally.
-                    parts_cost += ch.get("quantity", 0) * (p.get("unit_price", 0.0) or 0.0)
+            parts_cost = get_farm_wide_parts_cost()
         except Exception:
             parts_cost = 0.0
 
     # If equipment has maintenance_history with estimated costs, sum them
-    maintenance_hist = rec.get("maintenance_history", [])
-    total_maintenance_cost = 0.0
-    for m in maintenance_hist:
-        # we may have added no explicit costs — accept a `estimated_cost` field if present
-        total_maintenance_cost += float(m.get("estimated_cost", 0.0))
+    # we may have added no explicit costs — accept a `estimated_cost` field if present
+    maintenance_hist, evicted_maint_cost, _ = _maintenance_lifetime(rec)
+    total_maintenance_cost = math.fsum(float(m.get("estimated_cost", 0.0)) for m in maintenance_hist) + evicted_maint_cost
 
     # ----- Labor cost estimate -----
     # Prefer explicit labor_cost_per_hour on equipment, else default value
@@ -1166,11 +1541,9 @@ def compute_equipment_operating_cost(equipment_id: str) -> Optional[Dict[str, An
     try:
         # _worker_operations defined in this service file
         total_logged_hours = 0.0
-        with _worker_lock:
-            ops = _worker_operations.get(equipment_id, [])
-            for op in ops:
-                if op.get("duration_hours"):
-                    total_logged_hours += float(op["duration_hours"])
+        for op in list(_worker_operations.get(equipment_id, ())):
+            if op.get("duration_hours"):
+                total_logged_hours += float(op["duration_hours"])
         # if logged hours present, prefer that (otherwise fallback to usage_hours)
         hours_for_labor = total_logged_hours if total_logged_hours > 0 else usage_hours
     except Exception:
@@ -1187,7 +1560,7 @@ def compute_equipment_operating_cost(equipment_id: str) -> Optional[Dict[str, An
     else:
         cost_per_hour = None
 
-    return {
+    result = {
         "equipment_id": equipment_id,
         "total_fuel_cost": round(total_fuel_cost, 2),
         "total_parts_cost": round(parts_cost, 2),
@@ -1205,6 +1578,8 @@ def compute_equipment_operating_cost(equipment_id: str) -> Optional[Dict[str, An
         },
         "calculated_at": datetime.utcnow(),
     }
+    _cost_cache_put(cache_key, result)
+    return result
 
 
 def estimate_equipment_depreciation(equipment_id: str, years: int = 5, method: str = "straight_line") -> Optional[Dict[str, Any]]:
@@ -1223,10 +1598,14 @@ def estimate_equipment_depreciation(equipment_id: str, years: int = 5, method: s
       }
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
+
+    cache_key = ("depreciation", equipment_id, _equipment_version.get(equipment_id, 0), years, method)
+    cached = _cost_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     purchase_price = float(rec.get("purchase_price", 0.0))
     purchase_date = rec.get("purchase_date")
@@ -1245,11 +1624,20 @@ def estimate_equipment_depreciation(equipment_id: str, years: int = 5, method: s
     total_depr = 0.0
 
     if method == "straight_line":
+        # constant charge: book values are a running rounded difference
         annual = round(purchase_price / max(1, years), 2)
-        for y in range(1, years + 1):
-            book_value = round(book_value - annual, 2)
-            total_depr += annual
-            schedule.append({"year": y, "depreciation": annual, "book_value": max(0.0, book_value)})
+        books = list(itertools.accumulate(
+            itertools.repeat(annual, years),
+            lambda bv, a: round(bv - a, 2),
+            initial=purchase_price,
+        ))[1:]
+        schedule = [
+            {"year": y, "depreciation": annual, "book_value": max(0.0, bv)}
+            for y, bv in enumerate(books, 1)
+        ]
+        if books:
+            book_value = books[-1]
+        total_depr = sum(itertools.repeat(annual, years), 0.0)
     else:
         # simple declining balance: 1.5 / years factor
         rate = min(0.5, 1.5 / max(1, years))
@@ -1259,7 +1647,7 @@ def estimate_equipment_depreciation(equipment_id: str, years: int = 5, method: s
             total_depr += depr
             schedule.append({"year": y, "depreciation": depr, "book_value": max(0.0, book_value)})
 
-    return {
+    result = {
         "equipment_id": equipment_id,
         "purchase_price": purchase_price,
         "years": years,
@@ -1269,9 +1657,15 @@ def estimate_equipment_depreciation(equipment_id: str, years: int = 5, method: s
         "estimated_book_value": round(book_value, 2),
         "calculated_at": datetime.utcnow(),
     }
+    _cost_cache_put(cache_key, result)
+    return result
 
 
-def compute_equipment_roi(equipment_id: str, analysis_period_years: int = 1) -> Optional[Dict[str, Any]]:
+def compute_equipment_roi(
+    equipment_id: str,
+    analysis_period_years: int = 1,
+    _cache: Optional[dict] = None
+) -> Optional[Dict[str, Any]]:
     """
     Compute a mock ROI for the equipment over the analysis_period_years.
     Heuristic used:
@@ -1294,13 +1688,16 @@ def compute_equipment_roi(equipment_id: str, analysis_period_years: int = 1) ->
     NOTE: This is a heuristic placeholder for UI and analysis; replace with real allocation later.
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    memo_key = ("roi", equipment_id, analysis_period_years)
+    if _cache is not None and memo_key in _cache:
+        return _cache[memo_key]
+
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
     # Operating costs (annualized to period)
-    cost_summary = compute_equipment_operating_cost(equipment_id)
+    cost_summary = compute_equipment_operating_cost(equipment_id, _cache=_cache)
     if not cost_summary:
         return None
 
@@ -1319,9 +1716,8 @@ def compute_equipment_roi(equipment_id: str, analysis_period_years: int = 1) ->
     # A safer fallback: if total_usage_hours == 0, use recorded worker ops duration
     if hours_in_period <= 0:
         try:
-            with _worker_lock:
-                ops = _worker_operations.get(equipment_id, [])
-                hours_in_period = sum(op.get("duration_hours", 0) for op in ops)
+            ops = list(_worker_operations.get(equipment_id, ()))
+            hours_in_period = sum(op.get("duration_hours", 0) for op in ops)
         except Exception:
             hours_in_period = 0
 
@@ -1358,7 +1754,7 @@ def compute_equipment_roi(equipment_id: str, analysis_period_years: int = 1) ->
         f"Depreciation for period: {depr_for_period}."
     )
 
-    return {
+    result = {
         "equipment_id": equipment_id,
         "analysis_period_years": analysis_period_years,
         "estimated_revenue": estimated_revenue,
@@ -1370,6 +1766,9 @@ def compute_equipment_roi(equipment_id: str, analysis_period_years: int = 1) ->
         "explanation": explanation,
         "calculated_at": datetime.utcnow(),
     }
+    if _cache is not None:
+        _cache[memo_key] = result
+    return result
 
 # Knowledge base: crop → stage → required equipment types
 _CROP_EQUIP_KB = {
@@ -1397,6 +1796,24 @@ _CROP_EQUIP_KB = {
 }
 
 
+# Set view of _CROP_EQUIP_KB for O(1) type-membership checks (matched against
+# the lowercased equipment type); built once
+_CROP_EQUIP_KB_SETS = {
+    crop: {stage: frozenset(t.lower() for t in types) for stage, types in stages.items()}
+    for crop, stages in _CROP_EQUIP_KB.items()
+}
+
+
+# Flat (crop, stage) -> required types table and per-crop stage order, so
+# demand expansion does a single lookup per stage instead of nested gets
+_CROP_STAGE_REQUIRED: Dict[Tuple[str, str], List[str]] = {
+    (crop, stage): types
+    for crop, stages in _CROP_EQUIP_KB.items()
+    for stage, types in stages.items()
+}
+_CROP_STAGES: Dict[str, Tuple[str, ...]] = {crop: tuple(stages) for crop, stages in _CROP_EQUIP_KB.items()}
+
+
 def get_equipment_suitability_score(equipment_id: str, crop: str, stage: str) -> Optional[Dict[str, Any]]:
     """
     Computes a suitability score (0–100) of equipment for a given crop and stage.
@@ -1407,15 +1824,15 @@ def get_equipment_suitability_score(equipment_id: str, crop: str, stage: str) ->
     - seasonal usage (mock)
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
 
     crop = crop.lower()
     stage = stage.lower()
 
-    if crop not in _CROP_EQUIP_KB or stage not in _CROP_EQUIP_KB[crop]:
+    stage_types = _CROP_EQUIP_KB_SETS.get(crop, {}).get(stage)
+    if stage_types is None:
         return {
             "equipment_id": equipment_id,
             "crop": crop,
@@ -1424,23 +1841,32 @@ def get_equipment_suitability_score(equipment_id: str, crop: str, stage: str) ->
             "message": "No suitability rules found for crop/stage."
         }
 
-    required_types = _CROP_EQUIP_KB[crop][stage]
-    eq_type = eq.get("type", "").lower()
+    now = datetime.utcnow()
+    scores = _suitability_scores(eq, stage_types, now)
+    return _suitability_result(eq, crop, stage, scores, now)
+
+
+# best possible suitability score for equipment of a non-matching type
+_SUITABILITY_MISMATCH_CAP = 50
+
 
+def _suitability_scores(rec: Dict[str, Any], stage_types: frozenset, now: datetime) -> Tuple[int, int, int, int, int]:
+    """
+    Scoring kernel for suitability:
+    (final_score, type_score, health_score, idle_days, idle_score)
+    """
     # Type match score
-    if eq_type in required_types:
+    if rec.get("type_lower", "") in stage_types:
         type_score = 50
     else:
         type_score = 10  # still allow partial use if farmer improvises
 
     # Health Influence
-    health = compute_equipment_health(equipment_id)
-    health_score = health.get("health_score", 70)
+    health_score = _health_from_rec(rec, now).get("health_score", 70)
     health_weight = health_score * 0.2  # 20%
 
     # Idle Influence
-    idle = compute_idle_status(equipment_id)
-    idle_days = idle.get("idle_days", 0)
+    idle_days = (now - _last_activity_from_rec(rec)).days
 
     if idle_days < 7:
         idle_score = 20
@@ -1450,6 +1876,15 @@ def get_equipment_suitability_score(equipment_id: str, crop: str, stage: str) ->
         idle_score = 0
 
     final_score = int(min(100, type_score + health_weight + idle_score))
+    return final_score, type_score, health_score, idle_days, idle_score
+
+
+def _suitability_result(rec: Dict[str, Any], crop: str, stage: str, scores: Tuple, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Builds the suitability dict; calculated_at is left out when now is None
+    (the caller stamps the enclosing response instead).
+    """
+    final_score, type_score, health_score, idle_days, idle_score = scores
 
     label = "poor"
     if final_score >= 80:
@@ -1459,22 +1894,24 @@ def get_equipment_suitability_score(equipment_id: str, crop: str, stage: str) ->
     elif final_score >= 40:
         label = "moderate"
 
-    return {
-        "equipment_id": equipment_id,
+    result = {
+        "equipment_id": rec["id"],
         "crop": crop,
         "stage": stage,
         "suitability_score": final_score,
         "label": label,
         "details": {
-            "required_types": required_types,
-            "equipment_type": eq_type,
+            "required_types": list(_CROP_EQUIP_KB[crop][stage]),  # copy; the KB list is shared
+            "equipment_type": rec.get("type_lower", ""),
             "health_score": health_score,
             "idle_days": idle_days,
             "type_match_score": type_score,
             "idle_score": idle_score
         },
-        "calculated_at": datetime.utcnow()
     }
+    if now is not None:
+        result["calculated_at"] = now
+    return result
 
 
 def recommend_equipment_for_crop(crop: str, stage: str) -> Dict[str, Any]:
@@ -1485,27 +1922,36 @@ def recommend_equipment_for_crop(crop: str, stage: str) -> Dict[str, Any]:
     crop = crop.lower()
     stage = stage.lower()
 
-    results = []
-
     if crop not in _CROP_EQUIP_KB:
         return {"crop": crop, "stage": stage, "recommendations": [], "message": "Unknown crop"}
 
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
-
-    for eid in equipment_ids:
-        score = get_equipment_suitability_score(eid, crop, stage)
-        if score and score.get("suitability_score") is not None:
-            results.append(score)
+    # one pass over the snapshot keeping a min-heap frontier of the top 5;
+    # entries are (score, -position, ...) so earlier equipment wins ties
+    now = datetime.utcnow()
+    stage_types = _CROP_EQUIP_KB_SETS[crop].get(stage)
+    snapshot = _equipment_snapshot if stage_types is not None else ()
+    frontier = []
+    for pos, rec in enumerate(snapshot):
+        # a type mismatch caps the score at 10 + 20 (health) + 20 (idle),
+        # so once the frontier is full at >= 50 skip health/idle entirely
+        if (len(frontier) == 5 and frontier[0][0] >= _SUITABILITY_MISMATCH_CAP
+                and rec.get("type_lower", "") not in stage_types):
+            continue
+        scores = _suitability_scores(rec, stage_types, now)
+        entry = (scores[0], -pos, scores, rec)
+        if len(frontier) < 5:
+            heapq.heappush(frontier, entry)
+        elif entry > frontier[0]:
+            heapq.heapreplace(frontier, entry)
 
-    results.sort(key=lambda x: x["suitability_score"], reverse=True)
+    top = sorted(frontier, reverse=True)
 
     return {
         "crop": crop,
         "stage": stage,
-        "count": len(results),
-        "recommendations": results[:5],  # top 5
-        "timestamp": datetime.utcnow()
+        "count": len(snapshot),
+        "recommendations": [_suitability_result(rec, crop, stage, scores) for _, _, scores, rec in top],  # top 5
+        "timestamp": now
     }
 
 # Default stage durations (days) if not provided by user
@@ -1533,6 +1979,117 @@ def _iso(d):
 def _date_range(start_date, days):
     return [(start_date + timedelta(days=i)) for i in range(days)]
 
+
+@lru_cache(maxsize=64)
+def _iso_day_keys(start_ord: int, days: int) -> Tuple[str, ...]:
+    # ISO keys for consecutive days; the horizon starts today, so repeated
+    # forecasts on the same day reuse the same tuple
+    return tuple(d.isoformat() for d in _date_range(date.fromordinal(start_ord), days))
+
+
+def _mark_first_cover(marks: List[int], skip: List[int], lo: int, hi: int, seq: int) -> None:
+    # marks every still-unmarked day in [lo, hi] with seq; skip[d] points
+    # towards the next possibly-unmarked day, so each day is marked once
+    d = _next_unmarked(skip, lo)
+    while d <= hi:
+        marks[d] = seq
+        skip[d] = d + 1
+        d = _next_unmarked(skip, d + 1)
+
+
+def _next_unmarked(skip: List[int], d: int) -> int:
+    root = d
+    while skip[root] != root:
+        root = skip[root]
+    while skip[d] != root:
+        skip[d], d = root, skip[d]
+    return root
+
+def _expand_unit_plan(
+    plan: Dict[str, Any],
+    horizon_start: date,
+    horizon_days: int,
+    stage_durations: Dict[str, int]
+) -> Tuple[str, List[Dict[str, Any]], List[Tuple[str, int, int]]]:
+    """
+    Expands one unit plan into its stage schedule plus the
+    (equipment_type, first_offset, last_offset) demand windows that fall
+    inside the horizon. Touches no shared state, so plans can be expanded
+    in parallel.
+    """
+    unit_id = str(plan.get("unit_id", "unknown"))
+    crop = plan.get("crop", "").lower()
+    start_date_raw = plan.get("start_date")
+    # parse start_date (fallback to today)
+    try:
+        if isinstance(start_date_raw, str):
+            start_date = datetime.fromisoformat(start_date_raw).date()
+        elif isinstance(start_date_raw, datetime):
+            start_date = start_date_raw.date()
+        elif isinstance(start_date_raw, (date := None)) and hasattr(start_date_raw, "isoformat"):
+            start_date = start_date_raw
+        else:
+            start_date = horizon_start
+    except Exception:
+        start_date = horizon_start
+
+    # stages order: either provided or from KB if available
+    stages = plan.get("stages")
+    if not stages:
+        if crop in _CROP_STAGES:
+            stages = _CROP_STAGES[crop]
+        else:
+            # fallback generic lifecycle
+            stages = ["land_preparation", "sowing", "vegetative", "maturity", "harvesting"]
+
+    # compute schedule for unit
+    schedule_list = []
+    windows: List[Tuple[str, int, int]] = []
+
+    # allow explicit stage_start_overrides
+    overrides = plan.get("stage_start_overrides", {})
+
+    cursor_date = start_date
+    for stage in stages:
+        # if override start date provided for this stage, use it
+        if stage in overrides:
+            try:
+                cursor_date = datetime.fromisoformat(overrides[stage]).date()
+            except Exception:
+                pass
+
+        duration_days = stage_durations.get(stage, stage_durations.get(stage.lower(), 3))
+        stage_start = cursor_date
+        stage_end = stage_start + timedelta(days=max(0, int(duration_days) - 1))
+
+        # required equipment from KB for this crop/stage
+        required = _CROP_STAGE_REQUIRED.get((crop, stage)) or _CROP_STAGE_REQUIRED.get((crop, stage.lower()), [])
+
+        # write schedule entry
+        entry = {
+            "stage": stage,
+            "start_date": stage_start.isoformat(),
+            "end_date": stage_end.isoformat(),
+            "required_equipment": required,
+            "unit_id": unit_id,
+            "crop": crop
+        }
+        schedule_list.append(entry)
+
+        # map equipment requirement to each date in stage window (within
+        # horizon), driven by day offset from horizon_start
+        off_lo = max(0, (stage_start - horizon_start).days)
+        off_hi = min(horizon_days, (stage_end - horizon_start).days)
+        if off_lo <= off_hi:
+            for eq_type in required:
+                windows.append((eq_type, off_lo, off_hi))
+
+        # advance cursor
+        cursor_date = stage_end + timedelta(days=1)
+
+    return unit_id, schedule_list, windows
+
+
 def predict_equipment_demand(
     unit_plans: List[Dict[str, Any]],
     horizon_days: int = 90,
@@ -1559,7 +2116,7 @@ def predict_equipment_demand(
           "unit_schedule": {
               "<unit_id>": [ { "stage": "...", "start_date": iso, "end_date": iso, "required_equipment": [...] }, ... ]
           },
-          "summary": { "most_needed_types": [...], "peak_day": "YYYY-MM-DD", ... }
+          "summary": { "most_needed_types": [... top 10 ...], "peak_day": "YYYY-MM-DD", ... }
         }
     """
     if stage_durations is None:
@@ -1569,91 +2126,56 @@ def predict_equipment_demand(
     horizon_start = datetime.utcnow().date()
     horizon_end = horizon_start + timedelta(days=horizon_days)
 
-    # initialize date map
-    date_equipment_map: Dict[str, Dict[str, int]] = {}
-    for d in _date_range(horizon_start, horizon_days + 1):
-        date_equipment_map[d.isoformat()] = {}
+    # initialize date map; horizon_iso[i] is the ISO key for day offset i
+    horizon_iso = _iso_day_keys(horizon_start.toordinal(), horizon_days + 1)
+    date_equipment_map: Dict[str, Dict[str, int]] = {day_key: {} for day_key in horizon_iso}
 
     unit_schedule: Dict[str, List[Dict[str, Any]]] = {}
 
-    # aggregate required equipment types across units/stages into date_equipment_map
-    for plan in unit_plans:
-        unit_id = str(plan.get("unit_id", "unknown"))
-        crop = plan.get("crop", "").lower()
-        start_date_raw = plan.get("start_date")
-        # parse start_date (fallback to today)
-        try:
-            if isinstance(start_date_raw, str):
-                start_date = datetime.fromisoformat(start_date_raw).date()
-            elif isinstance(start_date_raw, datetime):
-                start_date = start_date_raw.date()
-            elif isinstance(start_date_raw, (date := None)) and hasattr(start_date_raw, "isoformat"):
-                start_date = start_date_raw
-            else:
-                start_date = horizon_start
-        except Exception:
-            start_date = horizon_start
-
-        # stages order: either provided or from KB if available
-        stages = plan.get("stages")
-        if not stages:
-            if crop in _CROP_EQUIP_KB:
-                stages = list(_CROP_EQUIP_KB[crop].keys())
-            else:
-                # fallback generic lifecycle
-                stages = ["land_preparation", "sowing", "vegetative", "maturity", "harvesting"]
-
-        # compute schedule for unit
-        schedule_list = []
-
-        # allow explicit stage_start_overrides
-        overrides = plan.get("stage_start_overrides", {})
-
-        cursor_date = start_date
-        for stage in stages:
-            # if override start date provided for this stage, use it
-            if stage in overrides:
-                try:
-                    cursor_date = datetime.fromisoformat(overrides[stage]).date()
-                except Exception:
-                    pass
-
-            duration_days = stage_durations.get(stage, stage_durations.get(stage.lower(), 3))
-            stage_start = cursor_date
-            stage_end = stage_start + timedelta(days=max(0, int(duration_days) - 1))
-
-            # required equipment from KB for this crop/stage
-            required = []
-            if crop in _CROP_EQUIP_KB and stage in _CROP_EQUIP_KB[crop]:
-                required = _CROP_EQUIP_KB[crop][stage]
-            elif crop in _CROP_EQUIP_KB and stage.lower() in _CROP_EQUIP_KB[crop]:
-                required = _CROP_EQUIP_KB[crop][stage.lower()]
-
-            # write schedule entry
-            entry = {
-                "stage": stage,
-                "start_date": stage_start.isoformat(),
-                "end_date": stage_end.isoformat(),
-                "required_equipment": required,
-                "unit_id": unit_id,
-                "crop": crop
-            }
-            schedule_list.append(entry)
-
-            # map equipment requirement to each date in stage window (within horizon)
-            for single_day in _date_range(stage_start, (stage_end - stage_start).days + 1):
-                if horizon_start <= single_day <= horizon_end:
-                    day_key = single_day.isoformat()
-                    if day_key not in date_equipment_map:
-                        date_equipment_map[day_key] = {}
-                    for eq_type in required:
-                        date_equipment_map[day_key][eq_type] = date_equipment_map[day_key].get(eq_type, 0) + 1
-
-            # advance cursor
-            cursor_date = stage_end + timedelta(days=1)
+    # per-type difference arrays over day offsets: a stage window adds +1 at
+    # its first day and -1 after its last, so each (stage, type) is O(1);
+    # prefix sums below expand them into per-day counts
+    type_index: Dict[str, int] = {}
+    type_diffs: List[List[int]] = []
+    # per type, the first window (in fold order) covering each day: a day
+    # lists its types in that order, as the old per-day fill inserted them
+    type_first: List[List[int]] = []
+    type_skip: List[List[int]] = []
+    seq = 0
+
+    # expand plans independently (fanned out for large batches), then fold
+    # their windows into the difference arrays in plan order
+    expanded = _scan_snapshot(
+        lambda plan: _expand_unit_plan(plan, horizon_start, horizon_days, stage_durations),
+        unit_plans
+    )
+    for unit_id, schedule_list, windows in expanded:
+        for eq_type, off_lo, off_hi in windows:
+            i = type_index.get(eq_type)
+            if i is None:
+                i = type_index[eq_type] = len(type_diffs)
+                type_diffs.append([0] * (horizon_days + 2))
+                type_first.append([0] * (horizon_days + 1))
+                type_skip.append(list(range(horizon_days + 2)))
+            diff = type_diffs[i]
+            diff[off_lo] += 1
+            diff[off_hi + 1] -= 1
+            _mark_first_cover(type_first[i], type_skip[i], off_lo, off_hi, seq)
+            seq += 1
 
         unit_schedule[unit_id] = schedule_list
 
+    day_rows: List[List[Tuple[int, str, int]]] = [[] for _ in horizon_iso]
+    for eq_type, i in type_index.items():
+        first = type_first[i]
+        for off, count in enumerate(itertools.accumulate(type_diffs[i][:-1])):
+            if count:
+                day_rows[off].append((first[off], eq_type, count))
+    for off, rows in enumerate(day_rows):
+        if rows:
+            rows.sort()  # window seqs are unique, so types never tie
+            date_equipment_map[horizon_iso[off]] = {eq_type: count for _, eq_type, count in rows}
+
     # compute summary: most needed types and peak day
     aggregate_counts: Dict[str, int] = {}
     peak_day = None
@@ -1666,17 +2188,13 @@ def predict_equipment_demand(
         for k, v in mapping.items():
             aggregate_counts[k] = aggregate_counts.get(k, 0) + v
 
-    most_needed = sorted(aggregate_counts.items(), key=lambda x: x[1], reverse=True)
+    # top types only; aggregate_counts carries the full breakdown
+    most_needed = heapq.nlargest(10, aggregate_counts.items(), key=lambda x: x[1])
 
     # compare against available farmer-owned equipment counts (quick check)
-    # build inventory counts by type from _equipment_store
-    available_counts: Dict[str, int] = {}
-    with _store_lock:
-        for eid, rec in _equipment_store.items():
-            if rec.get("status") == "replaced":
-                continue
-            etype = rec.get("type", "unknown").lower()
-            available_counts[etype] = available_counts.get(etype, 0) + 1
+    # inventory counts by type (maintained incrementally on writes)
+    with _type_counts_lock:
+        available_counts: Dict[str, int] = dict(_type_counts)
 
     shortages: List[Dict[str, Any]] = []
     # inspect the peak day mapping for shortages
@@ -1702,9 +2220,15 @@ def predict_equipment_demand(
         "generated_at": datetime.utcnow().isoformat(),
     }
 
-def aggregate_weekly_equipment_demand(demand_map: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+def aggregate_weekly_equipment_demand(
+    demand_map: Dict[str, Dict[str, int]],
+    horizon_start: Optional[date] = None
+) -> Dict[str, Any]:
     """
-    Converts date_equipment_map (daily) into weekly buckets:
+    Converts date_equipment_map (daily) into weekly buckets.
+    Pass horizon_start when the map comes from predict_equipment_demand
+    (one key per consecutive day) to skip re-parsing every day key.
+    Returns:
     {
       "week_1": {
         "start": "YYYY-MM-DD",
@@ -1722,15 +2246,22 @@ def aggregate_weekly_equipment_demand(demand_map: Dict[str, Dict[str, int]]) ->
     # Sort days
     sorted_dates = sorted(demand_map.keys())
 
-    def week_of(date_obj):
-        return date_obj.isocalendar()[1]  # ISO week number
+    # ISO week number per day
+    if horizon_start is not None:
+        # day i is horizon_start + i, and the week only changes on a Monday
+        start_wd = horizon_start.weekday()
+        wk = horizon_start.isocalendar()[1]
+        week_ids = []
+        for i in range(len(sorted_dates)):
+            if i and (start_wd + i) % 7 == 0:
+                wk = (horizon_start + timedelta(days=i)).isocalendar()[1]
+            week_ids.append(wk)
+    else:
+        week_ids = [date.fromisoformat(iso_day).isocalendar()[1] for iso_day in sorted_dates]
 
     weekly = {}
 
-    for iso_day in sorted_dates:
-        day_obj = datetime.fromisoformat(iso_day).date()
-        wk = week_of(day_obj)
-
+    for iso_day, wk in zip(sorted_dates, week_ids):
         week_key = f"week_{wk}"
 
         if week_key not in weekly:
@@ -1769,7 +2300,53 @@ def aggregate_weekly_equipment_demand(demand_map: Dict[str, Dict[str, int]]) ->
     
     return weekly
 
-def benchmark_equipment_performance(equipment_id: str) -> Optional[Dict[str, Any]]:
+# Threshold ladders as (steps, values) lookup tables: the value is
+# values[bisect(steps, x)]. bisect_right makes a step inclusive from below
+# (x >= step), bisect_left from above (x > step).
+_BENCH_FUEL_STEPS, _BENCH_FUEL_SCORES = (3, 4, 6), (90, 75, 60, 40)               # bisect_left on l/h
+_BENCH_IDLE_STEPS, _BENCH_IDLE_SCORES = (14, 30), (80, 60, 40)                    # bisect_right on idle days
+_BENCH_ROI_STEPS, _BENCH_ROI_SCORES = (0, 10, 30, 50), (30, 50, 70, 85, 95)       # bisect_right on roi %
+_BENCH_CATEGORY_STEPS = (40, 55, 70, 85)
+_BENCH_CATEGORIES = ("critical", "poor", "average", "good", "excellent")
+
+
+def _benchmark_score(
+    health_score: float,
+    fph: Optional[float],
+    breakdown_prob: float,
+    idle_days: int,
+    roi_percent: Optional[float]
+) -> int:
+    """
+    Weighted 0–100 performance score from the raw benchmark signals.
+    Plain arithmetic on scalars so bulk callers can run it without the
+    dict assembly around it.
+    """
+
+    # Score fuel efficiency (lower is better)
+    fuel_score = 50  # baseline
+    if fph:
+        fuel_score = _BENCH_FUEL_SCORES[bisect.bisect_left(_BENCH_FUEL_STEPS, fph)]
+
+    breakdown_score = max(0, 100 - breakdown_prob)
+
+    # Idle penalty
+    util_score = _BENCH_IDLE_SCORES[bisect.bisect_right(_BENCH_IDLE_STEPS, idle_days)]
+
+    roi_score = 70
+    if roi_percent is not None:
+        roi_score = _BENCH_ROI_SCORES[bisect.bisect_right(_BENCH_ROI_STEPS, roi_percent)]
+
+    return int(
+        health_score * 0.25 +
+        fuel_score * 0.15 +
+        breakdown_score * 0.20 +
+        util_score * 0.20 +
+        roi_score * 0.20
+    )
+
+
+def benchmark_equipment_performance(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Computes a performance benchmark score based on:
     - fuel efficiency
@@ -1784,89 +2361,42 @@ def benchmark_equipment_performance(equipment_id: str) -> Optional[Dict[str, Any
         excellent / good / average / poor / critical
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
+
+    signals = _cache if _cache is not None else {}
 
     # ======= HEALTH SCORE =======
-    health = compute_equipment_health(equipment_id)
+    health = compute_equipment_health(equipment_id, _cache=signals)
     health_score = health.get("health_score", 70)
 
     # ======= FUEL EFFICIENCY =======
-    fuel = compute_fuel_efficiency(equipment_id)
+    fuel = compute_fuel_efficiency(equipment_id, _cache=signals)
     if fuel and "fuel_efficiency" in fuel:
         fph = fuel["fuel_efficiency"].get("liters_per_hour") or None
     else:
         fph = None
-    
-    # Score fuel efficiency (lower is better)
-    fuel_score = 50  # baseline
-    if fph:
-        if fph <= 3:
-            fuel_score = 90
-        elif fph <= 4:
-            fuel_score = 75
-        elif fph <= 6:
-            fuel_score = 60
-        else:
-            fuel_score = 40
 
     # ======= BREAKDOWN PROBABILITY =======
-    breakdown = compute_breakdown_probability(equipment_id)
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals)
     breakdown_prob = breakdown.get("breakdown_probability", 20)
-    breakdown_score = max(0, 100 - breakdown_prob)
 
     # ======= IDLE & UTILIZATION =======
-    util = compute_equipment_utilization(equipment_id)
+    util = compute_equipment_utilization(equipment_id, _cache=signals)
     avg_usage = util.get("avg_daily_usage", 1)
-    idle = compute_idle_status(equipment_id)
+    idle = compute_idle_status(equipment_id, _cache=signals)
     idle_days = idle.get("idle_days", 0)
 
-    # Idle penalty
-    if idle_days >= 30:
-        util_score = 40
-    elif idle_days >= 14:
-        util_score = 60
-    else:
-        util_score = 80
-
     # ======= ROI PERFORMANCE =======
-    roi = compute_equipment_roi(equipment_id, analysis_period_years=1)
+    roi = compute_equipment_roi(equipment_id, analysis_period_years=1, _cache=signals)
     roi_percent = roi.get("roi_percent")
-    roi_score = 70
-    if roi_percent is not None:
-        if roi_percent >= 50:
-            roi_score = 95
-        elif roi_percent >= 30:
-            roi_score = 85
-        elif roi_percent >= 10:
-            roi_score = 70
-        elif roi_percent >= 0:
-            roi_score = 50
-        else:
-            roi_score = 30
 
     # ======= FINAL WEIGHTED SCORE =======
-    final_score = int(
-        health_score * 0.25 +
-        fuel_score * 0.15 +
-        breakdown_score * 0.20 +
-        util_score * 0.20 +
-        roi_score * 0.20
-    )
+    final_score = _benchmark_score(health_score, fph, breakdown_prob, idle_days, roi_percent)
 
     # category
-    if final_score >= 85:
-        category = "excellent"
-    elif final_score >= 70:
-        category = "good"
-    elif final_score >= 55:
-        category = "average"
-    elif final_score >= 40:
-        category = "poor"
-    else:
-        category = "critical"
+    category = _BENCH_CATEGORIES[bisect.bisect_right(_BENCH_CATEGORY_STEPS, final_score)]
 
     # ======= RECOMMENDATIONS =======
 
@@ -1906,17 +2436,15 @@ def fleet_performance_benchmark():
     """
     Returns sorted performance benchmarks for all equipment.
     """
-    results = []
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
-
-    for eid in eq_ids:
-        perf = benchmark_equipment_performance(eid)
-        if perf:
-            results.append(perf)
+    # per-equipment benchmarks over the active (not replaced) snapshot, no
+    # store lock, fanned out to the scan pool for large fleets
+    results = [
+        perf for perf in _scan_snapshot(lambda rec: benchmark_equipment_performance(rec["id"]), _active_equipment_snapshot)
+        if perf
+    ]
 
     # sort best → worst
-    results.sort(key=lambda x: x["performance_score"], reverse=True)
+    results.sort(key=itemgetter("performance_score"), reverse=True)
 
     return {
         "count": len(results),
@@ -1924,7 +2452,25 @@ def fleet_performance_benchmark():
         "timestamp": datetime.utcnow().isoformat()
     }
 
-def recommend_equipment_replacement(equipment_id: str) -> Optional[Dict[str, Any]]:
+# Replacement penalty ladders (see _benchmark_score for the table layout)
+_REPL_AGE_STEPS, _REPL_AGE_PENALTY = (3, 5, 8), (0, 5, 15, 30)                    # bisect_right
+_REPL_HEALTH_STEPS, _REPL_HEALTH_PENALTY = (40, 60, 75), (30, 15, 5, 0)           # bisect_right
+_REPL_BREAKDOWN_STEPS, _REPL_BREAKDOWN_PENALTY = (30, 50, 70), (0, 5, 15, 30)     # bisect_right
+_REPL_MAINT_STEPS, _REPL_MAINT_PENALTY = (500, 1000), (0, 8, 15)                  # bisect_left
+_REPL_ROI_STEPS, _REPL_ROI_PENALTY = (0, 5, 15), (25, 10, 3, 0)                   # bisect_right
+_REPL_COST_STEPS, _REPL_COST_PENALTY = (50, 100), (0, 8, 15)                      # bisect_left
+# score <= step → (recommendation, urgency, months_to_replace)
+_REPL_OUTCOME_STEPS = (20, 40, 60, 80)
+_REPL_OUTCOMES = (
+    ("replace", "immediate", 0),
+    ("replace", "high", 1),  # within 1 month
+    ("service", "medium", 3),
+    ("monitor", "low", 6),
+    ("no_action", "low", 12),
+)
+
+
+def recommend_equipment_replacement(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Heuristic replacement recommendation engine.
 
@@ -1949,10 +2495,9 @@ def recommend_equipment_replacement(equipment_id: str) -> Optional[Dict[str, Any
       }
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
     now = datetime.utcnow()
 
@@ -1965,36 +2510,43 @@ def recommend_equipment_replacement(equipment_id: str) -> Optional[Dict[str, Any
         except:
             age_years = None
 
+    signals = _cache if _cache is not None else {}
+
     # Health
-    health = compute_equipment_health(equipment_id) or {}
+    health = compute_equipment_health(equipment_id, _cache=signals) or {}
     health_score = health.get("health_score", 70)
 
     # Breakdown probability
-    breakdown = compute_breakdown_probability(equipment_id) or {}
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals) or {}
     breakdown_prob = breakdown.get("breakdown_probability", 20)
 
     # Operating cost and cost_per_hour
-    cost_summary = compute_equipment_operating_cost(equipment_id) or {}
+    cost_summary = compute_equipment_operating_cost(equipment_id, _cache=signals) or {}
     cost_per_hour = cost_summary.get("cost_per_hour")
     total_operating_cost = cost_summary.get("total_operating_cost", 0.0)
 
     # Maintenance cost trend (sum of estimated_cost in maintenance_history)
-    maintenance_hist = rec.get("maintenance_history", [])
-    maint_cost_sum = 0.0
-    for m in maintenance_hist:
-        try:
-            maint_cost_sum += float(m.get("estimated_cost", 0.0))
-        except:
-            pass
+    # one pass over clean data; only fall back to per-entry coercion (skipping
+    # unparseable costs) if some entry fails
+    maintenance_hist, evicted_maint_cost, _ = _maintenance_lifetime(rec)
+    try:
+        maint_cost_sum = math.fsum(float(m.get("estimated_cost", 0.0)) for m in maintenance_hist)
+    except (TypeError, ValueError):
+        maint_cost_sum = 0.0
+        for m in maintenance_hist:
+            try:
+                maint_cost_sum += float(m.get("estimated_cost", 0.0))
+            except (TypeError, ValueError):
+                pass
+    maint_cost_sum += evicted_maint_cost
 
     # ROI
-    roi = compute_equipment_roi(equipment_id, analysis_period_years=1) or {}
+    roi = compute_equipment_roi(equipment_id, analysis_period_years=1, _cache=signals) or {}
     roi_percent = roi.get("roi_percent")
 
     # Spare parts scarcity: check assigned parts and global parts store
     try:
-        from app.services.farmer.spare_parts_service import get_parts_for_equipment
-        parts_info = get_parts_for_equipment(equipment_id) or {}
+        parts_info = _parts_for_equipment(equipment_id, signals) or {}
         low_stock_parts = 0
         missing_parts = 0
         for item in parts_info.get("items", []):
@@ -2014,79 +2566,34 @@ def recommend_equipment_replacement(equipment_id: str) -> Optional[Dict[str, Any
 
     # Age penalty (older equipment is more likely to be replaced)
     if age_years is not None:
-        if age_years >= 8:
-            score -= 30
-        elif age_years >= 5:
-            score -= 15
-        elif age_years >= 3:
-            score -= 5
+        score -= _REPL_AGE_PENALTY[bisect.bisect_right(_REPL_AGE_STEPS, age_years)]
 
     # Health penalty
-    if health_score < 40:
-        score -= 30
-    elif health_score < 60:
-        score -= 15
-    elif health_score < 75:
-        score -= 5
+    score -= _REPL_HEALTH_PENALTY[bisect.bisect_right(_REPL_HEALTH_STEPS, health_score)]
 
     # Breakdown penalty
-    if breakdown_prob >= 70:
-        score -= 30
-    elif breakdown_prob >= 50:
-        score -= 15
-    elif breakdown_prob >= 30:
-        score -= 5
+    score -= _REPL_BREAKDOWN_PENALTY[bisect.bisect_right(_REPL_BREAKDOWN_STEPS, breakdown_prob)]
 
-    # Maintenance costs penalty
-    if maint_cost_sum > 1000:  # tune: high cumulative maintenance
-        score -= 15
-    elif maint_cost_sum > 500:
-        score -= 8
+    # Maintenance costs penalty (tune: high cumulative maintenance)
+    score -= _REPL_MAINT_PENALTY[bisect.bisect_left(_REPL_MAINT_STEPS, maint_cost_sum)]
 
     # Low ROI penalty
     if roi_percent is not None:
-        if roi_percent < 0:
-            score -= 25
-        elif roi_percent < 5:
-            score -= 10
-        elif roi_percent < 15:
-            score -= 3
+        score -= _REPL_ROI_PENALTY[bisect.bisect_right(_REPL_ROI_STEPS, roi_percent)]
 
     # Spare parts scarcity penalty
     score -= min(20, missing_parts * 15 + low_stock_parts * 5)
 
     # Cost efficiency penalty (very high cost_per_hour suggests replacement consideration)
     if cost_per_hour is not None:
-        if cost_per_hour > 100:
-            score -= 15
-        elif cost_per_hour > 50:
-            score -= 8
+        score -= _REPL_COST_PENALTY[bisect.bisect_left(_REPL_COST_STEPS, cost_per_hour)]
 
     # Clamp
     score = max(0, min(100, int(score)))
 
     # Map score to recommendation & urgency
     # Lower score → more urgent to replace
-    if score <= 20:
-        recommendation = "replace"
-        urgency = "immediate"
-        months_to_replace = 0
-    elif score <= 40:
-        recommendation = "replace"
-        urgency = "high"
-        months_to_replace = 1  # within 1 month
-    elif score <= 60:
-        recommendation = "service"
-        urgency = "medium"
-        months_to_replace = 3
-    elif score <= 80:
-        recommendation = "monitor"
-        urgency = "low"
-        months_to_replace = 6
-    else:
-        recommendation = "no_action"
-        urgency = "low"
-        months_to_replace = 12
+    recommendation, urgency, months_to_replace = _REPL_OUTCOMES[bisect.bisect_left(_REPL_OUTCOME_STEPS, score)]
 
     # Build rationale messages
     rationale = []
@@ -2116,7 +2623,7 @@ def recommend_equipment_replacement(equipment_id: str) -> Optional[Dict[str, Any
         "replacement_score": score,
         "rationale": rationale,
         "explanation": explanation,
-        "calculated_at": datetime.utcnow().isoformat()
+        "calculated_at": now.isoformat()
     }
 
 
@@ -2131,15 +2638,14 @@ def fleet_replacement_recommendations(threshold_urgency: str = "medium") -> Dict
         threshold_urgency = "medium"
 
     results = []
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
+    snapshot = _active_equipment_snapshot  # already replaced equipment is skipped
+    recs = _scan_snapshot(lambda equip: recommend_equipment_replacement(equip["id"]), snapshot)
 
-    for eid in eq_ids:
-        rec = recommend_equipment_replacement(eid)
+    for equip_meta, rec in zip(snapshot, recs):
         if not rec:
             continue
+        eid = equip_meta["id"]
         # Include equipment meta
-        equip_meta = _equipment_store.get(eid, {})
         rec_payload = {
             "equipment_id": eid,
             "name": equip_meta.get("name"),
@@ -2155,7 +2661,7 @@ def fleet_replacement_recommendations(threshold_urgency: str = "medium") -> Dict
             results.append(rec_payload)
 
     # Sort by urgency (immediate first) then worst score first
-    results.sort(key=lambda x: (["immediate","high","medium","low"].index(x["urgency"]), x["replacement_score"]))
+    results.sort(key=lambda x: (urgency_rank.get(x["urgency"], 3), x["replacement_score"]))
 
     return {
         "threshold_urgency": threshold_urgency,
@@ -2173,18 +2679,30 @@ def mark_equipment_replaced(
     Marks the equipment as replaced, archives it, and prevents it from showing in active fleet analytics.
     """
 
-    with _store_lock:
+    # timestamp is formatted before the lock; the lock only covers the
+    # field assignments
+    replaced_at = datetime.utcnow().isoformat()
+
+    with _record_lock(equipment_id):
         eq = _equipment_store.get(equipment_id)
         if not eq:
             return {"error": "equipment_not_found"}
 
         # Update lifecycle status
+        if eq.get("status") != "replaced":
+            _adjust_type_count(eq["type_lower"], -1)
         eq["status"] = "replaced"
-        eq["replaced_at"] = datetime.utcnow().isoformat()
+        eq["replaced_at"] = replaced_at
         eq["replacement_notes"] = notes
 
         if replaced_by_equipment_id:
             eq["replaced_by_equipment_id"] = replaced_by_equipment_id
+        _bump_version(equipment_id)
+
+    # republish after the record lock is released (delete takes the store
+    # lock first, then the record lock)
+    with _store_lock:
+        _publish_snapshot()
 
     return {
         "success": True,
@@ -2194,7 +2712,7 @@ def mark_equipment_replaced(
         "notes": notes
     }
 
-def analyze_failure_root_cause(equipment_id: str) -> Optional[Dict[str, Any]]:
+def analyze_failure_root_cause(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Performs heuristic root-cause analysis (RCA) for likely equipment failure types.
     Uses:
@@ -2217,43 +2735,50 @@ def analyze_failure_root_cause(equipment_id: str) -> Optional[Dict[str, Any]]:
       }
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
+
+    now = datetime.utcnow()
+    signals = _cache if _cache is not None else {}
 
     # Gather signals
-    health = compute_equipment_health(equipment_id) or {}
+    health = compute_equipment_health(equipment_id, _cache=signals) or {}
     health_score = health.get("health_score", 70)
 
-    breakdown = compute_breakdown_probability(equipment_id) or {}
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals) or {}
     breakdown_prob = breakdown.get("breakdown_probability", 20)
 
-    fuel = compute_fuel_efficiency(equipment_id) or {}
+    fuel = compute_fuel_efficiency(equipment_id, _cache=signals) or {}
     fph = None
     if fuel and "fuel_efficiency" in fuel:
         fph = fuel["fuel_efficiency"].get("liters_per_hour")
 
-    idle = compute_idle_status(equipment_id) or {}
+    idle = compute_idle_status(equipment_id, _cache=signals) or {}
     idle_days = idle.get("idle_days", 0)
 
-    maintenance_history = eq.get("maintenance_history", [])
+    maintenance_history, _, evicted_latest = _maintenance_lifetime(eq)
 
     # Count time since last maintenance
     last_maint_days = None
-    if maintenance_history:
+    if maintenance_history or evicted_latest:
         try:
-            last_maint = max(maintenance_history, key=lambda x: x.get("performed_at", ""))
-            if last_maint.get("performed_at"):
-                d = datetime.fromisoformat(last_maint["performed_at"]).date()
-                last_maint_days = (datetime.utcnow().date() - d).days
+            # history can be backdated, so scan for the latest ISO timestamp
+            # (one pass, no key function), starting from the evicted entries'
+            last_performed = evicted_latest
+            for m in maintenance_history:
+                performed_at = m.get("performed_at") or ""
+                if performed_at > last_performed:
+                    last_performed = performed_at
+            if last_performed:
+                d = datetime.fromisoformat(last_performed).date()
+                last_maint_days = (now.date() - d).days
         except:
             last_maint_days = None
 
     # Spare parts signals
     try:
-        from app.services.farmer.spare_parts_service import get_parts_for_equipment
-        parts_info = get_parts_for_equipment(equipment_id)
+        parts_info = _parts_for_equipment(equipment_id, signals)
         low_stock = []
         missing_parts = []
         for item in parts_info.get("items", []):
@@ -2341,7 +2866,7 @@ def analyze_failure_root_cause(equipment_id: str) -> Optional[Dict[str, Any]]:
         })
 
     # Rank by confidence
-    causes.sort(key=lambda x: x["confidence"], reverse=True)
+    top_causes = heapq.nlargest(5, causes, key=itemgetter("confidence"))
 
     # =============================
     # Recommendations
@@ -2365,9 +2890,9 @@ def analyze_failure_root_cause(equipment_id: str) -> Optional[Dict[str, Any]]:
 
     return {
         "equipment_id": equipment_id,
-        "root_causes": causes[:5],
+        "root_causes": top_causes,
         "recommended_actions": recommendations,
-        "calculated_at": datetime.utcnow().isoformat()
+        "calculated_at": now.isoformat()
     }
 
 # Predictive maintenance scheduling store
@@ -2375,23 +2900,38 @@ _scheduled_maintenance_store: Dict[str, List[Dict[str, Any]]] = {}
 _scheduled_maintenance_lock = Lock()
 
 
-def _is_peak_day_for_equipment(equipment_type: str, date_iso: str, unit_plans: List[Dict[str, Any]] = None) -> bool:
+def _compute_peak_map(unit_plans: List[Dict[str, Any]] = None, horizon_days: int = 30) -> Dict[str, Dict[str, int]]:
     """
-    Helper: given an equipment_type and date (ISO) tell if that date is high-demand (peak)
-    based on provided unit_plans via predict_equipment_demand or None (best-effort).
+    Helper: date_equipment_map from predict_equipment_demand for the given
+    unit_plans (best-effort; empty on failure). Compute once per caller and
+    look days up with _is_peak_day_for_equipment.
     """
     try:
         # if caller provided plans, use them; otherwise run a default short horizon empty-plan check
         if unit_plans is None:
             unit_plans = []
-        # call predict_equipment_demand to get date_equipment_map
-        demand = predict_equipment_demand(unit_plans, horizon_days=30)
-        day_map = demand.get("date_equipment_map", {}).get(date_iso, {})
-        count = day_map.get(equipment_type, 0)
-        # treat >0 as demand; treat >=2 as peak for our heuristic
-        return count >= 2
+        demand = predict_equipment_demand(unit_plans, horizon_days=horizon_days)
+        return demand.get("date_equipment_map", {})
     except Exception:
-        return False
+        return {}
+
+
+def _is_peak_day_for_equipment(
+    equipment_type: str,
+    date_iso: str,
+    unit_plans: List[Dict[str, Any]] = None,
+    peak_map: Optional[Dict[str, Dict[str, int]]] = None
+) -> bool:
+    """
+    Helper: given an equipment_type and date (ISO) tell if that date is high-demand (peak)
+    based on provided unit_plans via predict_equipment_demand or None (best-effort).
+    Pass a precomputed peak_map to skip the forecast.
+    """
+    if peak_map is None:
+        peak_map = _compute_peak_map(unit_plans)
+    count = peak_map.get(date_iso, {}).get(equipment_type, 0)
+    # treat >0 as demand; treat >=2 as peak for our heuristic
+    return count >= 2
 
 
 def optimize_maintenance_schedule(
@@ -2421,16 +2961,18 @@ def optimize_maintenance_schedule(
       }
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
     # Get schedule & health signals
     schedule = generate_maintenance_schedule(equipment_id)
     if not schedule:
         return None
 
+    now = datetime.utcnow()
+    today = now.date()
+
     next_due = schedule.get("next_maintenance_date")
     if isinstance(next_due, datetime):
         next_due_date = next_due.date()
@@ -2438,70 +2980,74 @@ def optimize_maintenance_schedule(
         try:
             next_due_date = datetime.fromisoformat(next_due).date()
         except:
-            next_due_date = datetime.utcnow().date()
+            next_due_date = today
     else:
-        next_due_date = datetime.utcnow().date()
+        next_due_date = today
+
+    # demand forecast is the same for every day; compute it once and keep
+    # the peak days for this type as offsets from today
+    eq_type = rec.get("type_lower", "")
+    peak_offsets = set()
+    if avoid_peak:
+        peak_map = _compute_peak_map(unit_plans)
+        peak_offsets = {
+            (date.fromisoformat(iso) - today).days
+            for iso in peak_map
+            if _is_peak_day_for_equipment(eq_type, iso, peak_map=peak_map)
+        }
 
-    today = datetime.utcnow().date()
-    horizon_end = today + timedelta(days=horizon_days)
-
-    # Build a daily score map: lower score = better day to schedule (avoid peak)
-    daily_scores: Dict[str, int] = {}
-    for i in range(horizon_days + 1):
-        d = today + timedelta(days=i)
-        iso = d.isoformat()
-        # base score: distance from next_due (days_left) -> lower days_left when overdue get priority
-        days_left = (d - next_due_date).days
-        score = max(0, days_left)  # prefer dates at/after due (lower)
-        # penalize weekend? optional (we'll slightly prefer weekdays)
-        if d.weekday() in (5, 6):
-            score += 2
-        # avoid peak increases score heavily
-        if avoid_peak and _is_peak_day_for_equipment(rec.get("type", "").lower(), iso, unit_plans):
-            score += 10
-        daily_scores[iso] = score
-
-    # Build candidate windows of min_window_days length and score them by sum
+    # Daily scores by day offset from today: lower score = better day to schedule (avoid peak)
+    due_offset = (next_due_date - today).days
+    first_weekday = today.weekday()
+    # base score: distance from next_due (days_left) -> lower days_left when overdue get priority;
+    # prefer dates at/after due (lower), and slightly prefer weekdays
+    daily_scores: List[int] = [
+        max(0, i - due_offset) + (2 if (first_weekday + i) % 7 >= 5 else 0)
+        for i in range(horizon_days + 1)
+    ]
+    # avoid peak increases score heavily; only touches the (few) peak days
+    for i in peak_offsets:
+        if 0 <= i <= horizon_days:
+            daily_scores[i] += 10
+
+    # Candidate windows of min_window_days length, scored by sum. Prefix sums
+    # give each window's total (and its count of >= 10 days, the peak
+    # penalty used above) in O(1).
+    window = max(0, min_window_days - 1) + 1
+    score_sums = [0, *itertools.accumulate(daily_scores)]
+    peak_counts = [0, *itertools.accumulate(sc >= 10 for sc in daily_scores)]
+
+    # priority: lower agg -> higher priority. we also boost urgents (when
+    # date before next_due): overdue windows (offset < due_offset) get -20
+    n_windows = horizon_days - window + 2
+    priorities = [
+        score_sums[i + window] - score_sums[i] - (20 if i < due_offset else 0)
+        for i in range(max(0, n_windows))
+    ]
+
+    # Return top N candidates (e.g., top 6), lowest agg_score first. Window
+    # start/end offsets are i and i + window - 1, so the day counts below
+    # are plain ints; dates are only built for the returned windows.
+    top = heapq.nsmallest(6, range(len(priorities)), key=priorities.__getitem__)
     candidates = []
-    for i in range(0, horizon_days - max(0, min_window_days-1) + 1):
+    for i in top:
         start = today + timedelta(days=i)
-        end = start + timedelta(days=max(0, min_window_days-1))
-        if end > horizon_end:
-            break
-        # compute aggregated score
-        agg = 0
-        peak_flag = False
-        for dd in (start + timedelta(days=k) for k in range((end - start).days + 1)):
-            s = daily_scores.get(dd.isoformat(), 0)
-            agg += s
-            if s >= 10:  # we used 10 as the peak-penalty earlier
-                peak_flag = True
-        # priority: lower agg -> higher priority. we also boost urgents (when date before next_due)
-        days_until_start = (start - next_due_date).days
-        priority_score = agg
-        if days_until_start < 0:
-            # overdue: make this window higher priority by lowering priority_score
-            priority_score -= 20
-
+        end = today + timedelta(days=i + window - 1)
         candidates.append({
             "start_date": start.isoformat(),
             "end_date": end.isoformat(),
-            "window_days": (end - start).days + 1,
-            "agg_score": priority_score,
-            "is_peak_window": peak_flag,
-            "days_until_window_start": (start - today).days,
-            "days_until_next_due": (start - next_due_date).days
+            "window_days": window,
+            "agg_score": priorities[i],
+            "is_peak_window": peak_counts[i + window] > peak_counts[i],
+            "days_until_window_start": i,
+            "days_until_next_due": i - due_offset
         })
 
-    # sort by agg_score ascending (lower is better)
-    candidates.sort(key=lambda x: x["agg_score"])
-
-    # Return top N candidates (e.g., top 6)
     return {
         "equipment_id": equipment_id,
         "next_due_date": next_due_date.isoformat(),
-        "candidates": candidates[:6],
-        "generated_at": datetime.utcnow().isoformat()
+        "candidates": candidates,
+        "generated_at": now.isoformat()
     }
 
 
@@ -2526,7 +3072,7 @@ def schedule_maintenance(
 
     # create schedule record
     rec = {
-        "schedule_id": str(uuid.uuid4()),
+        "schedule_id": os.urandom(16).hex(),  # random 128-bit id, no UUID object
         "equipment_id": equipment_id,
         "start_at": start_date.isoformat(),
         "end_at": end_date.isoformat(),
@@ -2556,16 +3102,25 @@ def list_scheduled_maintenances(equipment_id: str = None) -> Dict[str, Any]:
                 "count": len(_scheduled_maintenance_store.get(equipment_id, [])),
                 "schedules": _scheduled_maintenance_store.get(equipment_id, [])
             }
-        # else return all
-        aggregated = []
-        for eid, items in _scheduled_maintenance_store.items():
-            for it in items:
-                aggregated.append(it)
-        # sort by start_at
-        aggregated.sort(key=lambda x: x.get("start_at", ""))
+        # else return all, sorted by start_at. Per-equipment lists are in
+        # booking order (slots can be booked out of date order), so they are
+        # not guaranteed sorted runs for heapq.merge; sorted() over the chain
+        # still exploits whatever runs exist.
+        aggregated = sorted(
+            itertools.chain.from_iterable(_scheduled_maintenance_store.values()),
+            key=lambda x: x.get("start_at", "")
+        )
         return {"count": len(aggregated), "schedules": aggregated}
 
-def equipment_workload_pressure_score(equipment_id: str) -> Optional[Dict[str, Any]]:
+# Pressure ladders (see _benchmark_score for the table layout)
+_PRESSURE_USAGE_STEPS, _PRESSURE_USAGE_POINTS = (3, 5), (10, 25, 40)                  # bisect_right
+_PRESSURE_IDLE_STEPS, _PRESSURE_IDLE_POINTS = (2, 7), (20, 10, 0)                     # bisect_left
+_PRESSURE_HEALTH_STEPS, _PRESSURE_HEALTH_POINTS = (40, 60), (30, 15, 0)               # bisect_right
+_PRESSURE_BREAKDOWN_STEPS, _PRESSURE_BREAKDOWN_POINTS = (30, 50, 70), (0, 10, 20, 35)  # bisect_right
+_PRESSURE_DUE_STEPS, _PRESSURE_DUE_POINTS = (0, 7), (25, 15, 0)                       # bisect_left
+
+
+def equipment_workload_pressure_score(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Computes how overloaded or underutilized an equipment is.
     Higher score = more overloaded.
@@ -2577,67 +3132,53 @@ def equipment_workload_pressure_score(equipment_id: str) -> Optional[Dict[str, A
       - next maintenance due proximity
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
 
-    util = compute_equipment_utilization(equipment_id) or {}
+    now = datetime.utcnow()
+    today = now.date()
+
+    # one signals memo for every derived input of this equipment
+    signals = _cache if _cache is not None else {}
+
+    util = compute_equipment_utilization(equipment_id, _cache=signals) or {}
     avg_daily_usage = util.get("avg_daily_usage", 1)
 
-    idle = compute_idle_status(equipment_id) or {}
+    idle = compute_idle_status(equipment_id, _cache=signals) or {}
     idle_days = idle.get("idle_days", 0)
 
-    health = compute_equipment_health(equipment_id) or {}
+    health = compute_equipment_health(equipment_id, _cache=signals) or {}
     health_score = health.get("health_score", 70)
 
-    breakdown = compute_breakdown_probability(equipment_id) or {}
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals) or {}
     breakdown_prob = breakdown.get("breakdown_probability", 20)
 
-    maint = generate_maintenance_schedule(equipment_id) or {}
+    maint = generate_maintenance_schedule(equipment_id, _cache=signals) or {}
     next_due_raw = maint.get("next_maintenance_date")
     try:
         next_due = datetime.fromisoformat(next_due_raw).date()
     except:
-        next_due = datetime.utcnow().date()
-    days_until_due = (next_due - datetime.utcnow().date()).days
+        next_due = today
+    days_until_due = (next_due - today).days
 
     # Pressure scoring model
     score = 0
 
     # High avg usage increases pressure
-    if avg_daily_usage >= 5:
-        score += 40
-    elif avg_daily_usage >= 3:
-        score += 25
-    else:
-        score += 10
+    score += _PRESSURE_USAGE_POINTS[bisect.bisect_right(_PRESSURE_USAGE_STEPS, avg_daily_usage)]
 
     # Lower idle days = more pressure
-    if idle_days <= 2:
-        score += 20
-    elif idle_days <= 7:
-        score += 10
+    score += _PRESSURE_IDLE_POINTS[bisect.bisect_left(_PRESSURE_IDLE_STEPS, idle_days)]
 
     # Poor health increases pressure
-    if health_score < 40:
-        score += 30
-    elif health_score < 60:
-        score += 15
+    score += _PRESSURE_HEALTH_POINTS[bisect.bisect_right(_PRESSURE_HEALTH_STEPS, health_score)]
 
     # Breakdown probability
-    if breakdown_prob >= 70:
-        score += 35
-    elif breakdown_prob >= 50:
-        score += 20
-    elif breakdown_prob >= 30:
-        score += 10
+    score += _PRESSURE_BREAKDOWN_POINTS[bisect.bisect_right(_PRESSURE_BREAKDOWN_STEPS, breakdown_prob)]
 
     # Maintenance due soon increases pressure
-    if days_until_due <= 0:
-        score += 25
-    elif days_until_due <= 7:
-        score += 15
+    score += _PRESSURE_DUE_POINTS[bisect.bisect_left(_PRESSURE_DUE_STEPS, days_until_due)]
 
     # Normalize 0–100
     score = min(100, max(0, score))
@@ -2650,7 +3191,7 @@ def equipment_workload_pressure_score(equipment_id: str) -> Optional[Dict[str, A
         "health_score": health_score,
         "breakdown_probability": breakdown_prob,
         "days_until_maintenance_due": days_until_due,
-        "computed_at": datetime.utcnow().isoformat()
+        "computed_at": now.isoformat()
     }
 
 def recommend_workload_redistribution(
@@ -2673,19 +3214,16 @@ def recommend_workload_redistribution(
     underutilized = []
     balanced = []
 
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
-
-    # Filter by equipment type if provided
+    # filter on the published active snapshot's records (replaced equipment
+    # excluded), so an equipment deleted mid-scan can't raise a KeyError here
+    snapshot = _active_equipment_snapshot
     if equipment_types:
-        eq_ids = [
-            eid for eid in eq_ids
-            if _equipment_store[eid].get("type", "").lower() in equipment_types
-        ]
+        eq_ids = [rec["id"] for rec in snapshot if rec.get("type_lower", "") in equipment_types]
+    else:
+        eq_ids = [rec["id"] for rec in snapshot]
 
-    # Compute pressure for each equipment
-    for eid in eq_ids:
-        p = equipment_workload_pressure_score(eid)
+    # Compute pressure for each equipment (fanned out for large fleets)
+    for p in _scan_snapshot(equipment_workload_pressure_score, eq_ids):
         if not p:
             continue
         ps = p["pressure_score"]
@@ -2701,9 +3239,10 @@ def recommend_workload_redistribution(
         results.append(p)
 
     # Sort groups
-    overloaded.sort(key=lambda x: x["pressure_score"], reverse=True)
-    underutilized.sort(key=lambda x: x["pressure_score"])
-    balanced.sort(key=lambda x: x["pressure_score"])
+    by_pressure = itemgetter("pressure_score")
+    overloaded.sort(key=by_pressure, reverse=True)
+    underutilized.sort(key=by_pressure)
+    balanced.sort(key=by_pressure)
 
     recommendations = []
 
@@ -2770,22 +3309,19 @@ def detect_fuel_anomalies(
       }
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
-        fuel_history = list(rec.get("fuel_history", []))  # list of dicts
+    fuel_history = list(rec.get("fuel_history", []))  # list of dicts
 
     # filter lookback by date
-    cutoff = datetime.utcnow() - timedelta(days=lookback_days)
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=lookback_days)
     recent = []
     for entry in fuel_history:
-        try:
-            t = datetime.fromisoformat(entry.get("filled_at"))
-        except:
-            # if malformed, include conservatively
-            t = None
+        # entries without a timestamp are included conservatively
+        t = entry.get("filled_at")
         if t is None or t >= cutoff:
             recent.append(entry)
 
@@ -2797,7 +3333,7 @@ def detect_fuel_anomalies(
             "equipment_id": equipment_id,
             "anomalies": [],
             "summary": {"message": "no_recent_fuel_logs", "count": 0},
-            "checked_at": datetime.utcnow().isoformat()
+            "checked_at": now.isoformat()
         }
 
     # compute historical liters/hour (from compute_fuel_efficiency if available)
@@ -2906,7 +3442,7 @@ def detect_fuel_anomalies(
         "equipment_id": equipment_id,
         "anomalies": anomalies,
         "summary": summary,
-        "checked_at": datetime.utcnow().isoformat()
+        "checked_at": now.isoformat()
     }
 
 
@@ -2920,8 +3456,7 @@ def scan_fleet_fuel_anomalies(
     """
 
     results = []
-    with _store_lock:
-        equipment_ids = list(_equipment_store.keys())
+    equipment_ids = list(_equipment_store.keys())
 
     for eid in equipment_ids:
         res = detect_fuel_anomalies(eid, lookback_days=lookback_days,
@@ -2936,7 +3471,7 @@ def scan_fleet_fuel_anomalies(
         "scanned_at": datetime.utcnow().isoformat()
     }
 
-def analyze_equipment_cost_optimization(equipment_id: str) -> Optional[Dict[str, Any]]:
+def analyze_equipment_cost_optimization(equipment_id: str, _cache: Optional[dict] = None) -> Optional[Dict[str, Any]]:
     """
     Provides personalized cost-saving recommendations for a single equipment.
 
@@ -2959,19 +3494,22 @@ def analyze_equipment_cost_optimization(equipment_id: str) -> Optional[Dict[str,
       }
     """
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return None
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return None
 
-    cost_summary = compute_equipment_operating_cost(equipment_id) or {}
-    fuel_eff = compute_fuel_efficiency(equipment_id) or {}
-    health = compute_equipment_health(equipment_id) or {}
-    breakdown = compute_breakdown_probability(equipment_id) or {}
-    rca = analyze_failure_root_cause(equipment_id) or {}
-    perf = benchmark_equipment_performance(equipment_id) or {}
-    replacement = recommend_equipment_replacement(equipment_id) or {}
-    pressure = equipment_workload_pressure_score(equipment_id) or {}
+    # one signals memo shared with every analyzer below, so health,
+    # breakdown, cost, etc. are computed once for this equipment
+    signals = _cache if _cache is not None else {}
+    cost_summary = compute_equipment_operating_cost(equipment_id, _cache=signals) or {}
+
+    fuel_eff = compute_fuel_efficiency(equipment_id, _cache=signals) or {}
+    health = compute_equipment_health(equipment_id, _cache=signals) or {}
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals) or {}
+    rca = analyze_failure_root_cause(equipment_id, _cache=signals) or {}
+    perf = benchmark_equipment_performance(equipment_id, _cache=signals) or {}
+    replacement = recommend_equipment_replacement(equipment_id, _cache=signals) or {}
+    pressure = equipment_workload_pressure_score(equipment_id, _cache=signals) or {}
 
     # Extract key signals
     cost_per_hour = cost_summary.get("cost_per_hour", None)
@@ -3002,7 +3540,7 @@ def analyze_equipment_cost_optimization(equipment_id: str) -> Optional[Dict[str,
         })
 
     # Driver: overdue maintenance
-    maint = generate_maintenance_schedule(equipment_id) or {}
+    maint = generate_maintenance_schedule(equipment_id, _cache=signals) or {}
     next_due = maint.get("next_maintenance_date")
     try:
         due_date = datetime.fromisoformat(next_due).date()
@@ -3146,8 +3684,7 @@ def fleet_cost_optimization():
     """
 
     results = []
-    with _store_lock:
-        ids = list(_equipment_store.keys())
+    ids = list(_equipment_store.keys())
 
     for eid in ids:
         r = analyze_equipment_cost_optimization(eid)
@@ -3210,9 +3747,8 @@ def forecast_equipment_seasonal_workload(
             monthly_load[key][eq_type] = monthly_load[key].get(eq_type, 0) + count
 
     # Step 3: Convert to workload per actual equipment_id
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
-        snapshot = _equipment_store.copy()
+    eq_ids = list(_equipment_store.keys())
+    snapshot = _equipment_store.copy()
 
     equipment_result = []
 
@@ -3222,7 +3758,7 @@ def forecast_equipment_seasonal_workload(
         if rec.get("status") == "replaced":
             continue  # skip archived/replaced equipment
 
-        eq_type = rec.get("type", "").lower()
+        eq_type = rec.get("type_lower", "")
 
         # Build monthly load for this equipment
         eq_monthly = {}
@@ -3307,20 +3843,20 @@ def compute_equipment_profitability(
       }
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
 
-    eq_type = eq.get("type", "").lower()
+    eq_type = eq.get("type_lower", "")
 
     # Cost signals
-    cost_summary = compute_equipment_operating_cost(equipment_id) or {}
+    signals: dict = {}
+    cost_summary = compute_equipment_operating_cost(equipment_id, _cache=signals) or {}
     cost_per_hour = cost_summary.get("cost_per_hour", 0)
     total_cost = cost_summary.get("total_operating_cost", 0)
 
     # ROI signal
-    perf = benchmark_equipment_performance(equipment_id) or {}
+    perf = benchmark_equipment_performance(equipment_id, _cache=signals) or {}
     roi = perf.get("roi_percent", 0)
 
     # Seasonal workload
@@ -3454,8 +3990,7 @@ def fleet_profitability_ranking(unit_plans: List[dict]):
     """
 
     results = []
-    with _store_lock:
-        ids = list(_equipment_store.keys())
+    ids = list(_equipment_store.keys())
 
     for eid in ids:
         r = compute_equipment_profitability(eid, unit_plans)
@@ -3476,7 +4011,7 @@ _task_assignments: Dict[str, Dict[str, Any]] = {}  # task_id -> assignment recor
 _task_assignments_lock = Lock()
 
 
-def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any]) -> Dict[str, Any]:
+def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any], _cache: Optional[dict] = None) -> Dict[str, Any]:
     """
     Return a score object for equipment suitability for a given task.
     Factors:
@@ -3501,16 +4036,15 @@ def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any]) -> Dict[s
     crop = task.get("crop", "")
     stage = task.get("stage", "")
 
-    with _store_lock:
-        rec = _equipment_store.get(equipment_id)
-        if not rec:
-            return {"equipment_id": equipment_id, "score": 0, "breakdown": {}, "rationale": ["equipment_not_found"]}
+    rec = _equipment_store.get(equipment_id)
+    if not rec:
+        return {"equipment_id": equipment_id, "score": 0, "breakdown": {}, "rationale": ["equipment_not_found"]}
 
     # basic availability & status
     if rec.get("status") == "replaced":
         return {"equipment_id": equipment_id, "score": 0, "breakdown": {}, "rationale": ["equipment_replaced"]}
 
-    eq_type = rec.get("type", "").lower()
+    eq_type = rec.get("type_lower", "")
 
     breakdown = {}
     rationale = []
@@ -3536,7 +4070,7 @@ def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any]) -> Dict[s
         breakdown["suitability"] = 5
 
     # Pressure penalty
-    pressure = equipment_workload_pressure_score(equipment_id) or {}
+    pressure = equipment_workload_pressure_score(equipment_id, _cache=_cache) or {}
     pressure_score = pressure.get("pressure_score", 40)
     # convert pressure to penalty: higher pressure -> larger penalty
     pressure_penalty = int(min(30, (pressure_score / 100) * 30))
@@ -3545,7 +4079,7 @@ def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any]) -> Dict[s
         rationale.append("high_pressure")
 
     # Maintenance penalty
-    maint = generate_maintenance_schedule(equipment_id) or {}
+    maint = generate_maintenance_schedule(equipment_id, _cache=_cache) or {}
     days_left = None
     try:
         nd = maint.get("next_maintenance_date")
@@ -3567,7 +4101,7 @@ def _score_equipment_for_task(equipment_id: str, task: Dict[str, Any]) -> Dict[s
     breakdown["maintenance_penalty"] = maintenance_penalty
 
     # Cost penalty (higher cost -> penalty)
-    cost_summary = compute_equipment_operating_cost(equipment_id) or {}
+    cost_summary = compute_equipment_operating_cost(equipment_id, _cache=_cache) or {}
     cph = cost_summary.get("cost_per_hour")
     cost_penalty = 0
     if cph is not None:
@@ -3620,29 +4154,35 @@ def smart_assign_tasks(task_list: List[Dict[str, Any]], auto_confirm: bool = Fal
 
     # helper to check equipment free for a task window
     def equipment_free(eid, task_start, task_end):
+        # copy out the open windows under the lock, parse after releasing it
         with _task_assignments_lock:
-            for t, rec in _task_assignments.items():
-                if rec.get("equipment_id") != eid:
-                    continue
+            windows = [
+                (rec["start_iso"], rec["end_iso"])
+                for rec in _task_assignments.values()
+                if rec.get("equipment_id") == eid
                 # if status is cancelled or completed skip
-                if rec.get("status") in ("cancelled", "completed"):
-                    continue
-                a_s = datetime.fromisoformat(rec["start_iso"])
-                a_e = datetime.fromisoformat(rec["end_iso"])
-                if overlaps(a_s, a_e, task_start, task_end):
-                    return False
+                and rec.get("status") not in ("cancelled", "completed")
+            ]
+        for start_iso, end_iso in windows:
+            a_s = datetime.fromisoformat(start_iso)
+            a_e = datetime.fromisoformat(end_iso)
+            if overlaps(a_s, a_e, task_start, task_end):
+                return False
         return True
 
     assignments = []
     unassigned = []
 
     # snapshot equipment ids
-    with _store_lock:
-        equipment_ids = [eid for eid, r in _equipment_store.items() if r.get("status") != "replaced"]
+    equipment_ids = [eid for eid, r in list(_equipment_store.items()) if r.get("status") != "replaced"]
 
     # process higher priority tasks first
     tasks_sorted = sorted(task_list, key=lambda x: -(x.get("priority", 5)))
 
+    # per-equipment signals don't depend on the task, so one memo serves
+    # every task in this call
+    signals: dict = {}
+
     for task in tasks_sorted:
         tid = task.get("task_id") or str(uuid.uuid4())
         start_iso = task.get("start_iso")
@@ -3659,7 +4199,7 @@ def smart_assign_tasks(task_list: List[Dict[str, Any]], auto_confirm: bool = Fal
         candidates = []
         for eid in equipment_ids:
             # quick type filter: if equipment type is exact mismatch and not in preferred, deprioritize but still allowed
-            s = _score_equipment_for_task(eid, task)
+            s = _score_equipment_for_task(eid, task, signals)
             if s["score"] <= 0:
                 continue
             # check availability
@@ -3749,16 +4289,17 @@ def forecast_equipment_downtime(
       - fuel anomalies
     """
 
-    with _store_lock:
-        eq = _equipment_store.get(equipment_id)
-        if not eq:
-            return None
+    eq = _equipment_store.get(equipment_id)
+    if not eq:
+        return None
+
+    signals: dict = {}
 
     # Pull existing intelligence signals
-    health = compute_equipment_health(equipment_id) or {}
-    breakdown = compute_breakdown_probability(equipment_id) or {}
+    health = compute_equipment_health(equipment_id, _cache=signals) or {}
+    breakdown = compute_breakdown_probability(equipment_id, _cache=signals) or {}
     pressure = equipment_workload_pressure_score(equipment_id) or {}
-    maint = generate_maintenance_schedule(equipment_id) or {}
+    maint = generate_maintenance_schedule(equipment_id, _cache=signals) or {}
     cost = compute_equipment_operating_cost(equipment_id) or {}
     rca = analyze_failure_root_cause(equipment_id) or {}
     fuel_anom = detect_fuel_anomalies(equipment_id, lookback_days=30) or {}
@@ -3776,8 +4317,7 @@ def forecast_equipment_downtime(
         days_until_due = 10
 
     # Spare parts scarcity → downtime risk
-    from app.services.farmer.spare_parts_service import get_parts_for_equipment
-    parts_info = get_parts_for_equipment(equipment_id)
+    parts_info = _parts_for_equipment(equipment_id, signals)
     low_stock = []
     missing_parts = []
     for item in parts_info.get("items", []):
@@ -3895,8 +4435,7 @@ def forecast_equipment_downtime(
 
 def fleet_downtime_forecast(horizon_days: int = 30) -> Dict[str, Any]:
     results = []
-    with _store_lock:
-        ids = list(_equipment_store.keys())
+    ids = list(_equipment_store.keys())
 
     for eid in ids:
         r = forecast_equipment_downtime(eid, horizon_days)
@@ -4022,8 +4561,7 @@ def fleet_warranty_overview() -> Dict[str, Any]:
     """
 
     results = []
-    with _store_lock:
-        eq_ids = list(_equipment_store.keys())
+    eq_ids = list(_equipment_store.keys())
 
     for eid in eq_ids:
         results.append(get_warranty_status(eid))
@@ -22,6 +22,14 @@ from app.services.farmer.operator_behavior_service import (
 _fuel_logs: List[Dict[str, Any]] = []
 _fuel_lock = Lock()
 
+# Bumped on every fuel log write so dependent caches (equipment
+# effectiveness) can key on the current fuel log state.
+_fuel_logs_version = 0
+
+
+def get_fuel_logs_version() -> int:
+    return _fuel_logs_version
+
 
 def log_fuel_usage(
     equipment_id: str,
@@ -42,8 +50,10 @@ def log_fuel_usage(
         "operator_id": operator_id,
         "timestamp": timestamp or datetime.utcnow().isoformat()
     }
+    global _fuel_logs_version
     with _fuel_lock:
         _fuel_logs.append(entry)
+        _fuel_logs_version += 1
     return entry
 
 
@@ -15,6 +15,44 @@ _parts_store: Dict[str, Dict[str, Any]] = {}
 _assignment_store: Dict[str, List[Dict[str, Any]]] = {}  # equipment_id -> list of part assignments
 _parts_lock = Lock()
 
+# Bumped on every change to parts, prices or consumption so dependent
+# caches (equipment operating cost) can key on the current parts state.
+_parts_version = 0
+
+
+def _bump_parts_version() -> None:
+    # caller holds _parts_lock
+    global _parts_version
+    _parts_version += 1
+
+
+def get_parts_version() -> int:
+    return _parts_version
+
+
+# Farm-wide consumed parts cost as (parts_version, total); recomputed only
+# after a parts change, so per-equipment cost estimates don't rescan parts.
+_farm_parts_cost = (-1, 0.0)
+
+
+def get_farm_wide_parts_cost() -> float:
+    """
+    Sum of quantity * unit_price over every part's consumption_history.
+    """
+    global _farm_parts_cost
+    version, total = _farm_parts_cost
+    if version == _parts_version:
+        return total
+    with _parts_lock:
+        version = _parts_version
+        total = 0.0
+        for p in _parts_store.values():
+            unit_price = p.get("unit_price", 0.0) or 0.0
+            for ch in p.get("consumption_history", []):
+                total += ch.get("quantity", 0) * unit_price
+        _farm_parts_cost = (version, total)
+    return total
+
 
 
 
@@ -45,6 +83,7 @@ def add_part(
     }
     with _parts_lock:
         _parts_store[part_id] = rec
+        _bump_parts_version()
     return rec
 
 
@@ -77,6 +116,7 @@ def update_part(
         if metadata is not None:
             rec["metadata"].update(metadata)
         rec["updated_at"] = _now_iso()
+        _bump_parts_version()
     return rec
 
 
@@ -87,6 +127,7 @@ def delete_part(part_id: str) -> bool:
             # remove assignments referencing this part
             for eq_id, assigns in list(_assignment_store.items()):
                 _assignment_store[eq_id] = [a for a in assigns if a["part_id"] != part_id]
+            _bump_parts_version()
             return True
     return False
 
@@ -152,6 +193,7 @@ def consume_part(part_id: str, quantity: int = 1) -> Optional[Dict[str, Any]]:
             "consumed_at": _now_iso()
         })
         part["updated_at"] = _now_iso()
+        _bump_parts_version()
     return part
 
 
@@ -301,6 +343,7 @@ def add_part(part_id: str, name: str, unit_price: float = 0.0, quantity: int = 0
     }
     with _parts_lock:
         _parts_store[part_id] = rec
+        _bump_parts_version()
     return rec
 
 
@@ -325,6 +368,7 @@ def record_part_consumption(part_id: str, equipment_id: str, qty: float, used_at
             part["quantity"] = max(0, int(part.get("quantity", 0) - qty))
         except:
             part["quantity"] = 0
+        _bump_parts_version()
     return entry
 
 # -------------------------